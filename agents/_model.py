@@ -0,0 +1,41 @@
+# agents/_model.py
+import functools
+from google.adk.models.lite_llm import LiteLlm
+from typing import Optional, Union
+
+# Model prefixes that require the LiteLlm translation layer. Anything not
+# listed — native Google names like "gemini-2.0-flash" or "models/gemini-..."
+# — is passed straight through so ADK talks to Gemini directly without the
+# extra litellm frames and HTTP client. str.startswith on a tuple is a single
+# C-level scan, so adding providers here stays cheap.
+_LITELLM_PREFIXES = ("openai/", "anthropic/", "mistral/", "groq/", "together_ai/")
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_litellm(model_name: str, prompt_cache_key: Optional[str] = None) -> LiteLlm:
+    """Build (once) a LiteLlm wrapper for the given model name.
+
+    Memoizing here means every agent using the same model shares a single
+    wrapper and the provider client/connection pool behind it, instead of
+    re-initializing one per create_*_agent call.
+    """
+    if prompt_cache_key and model_name.startswith("openai/"):
+        # Route repeated requests from the same agent to the same OpenAI
+        # prompt-cache shard.
+        return LiteLlm(model=model_name, prompt_cache_key=prompt_cache_key)
+    return LiteLlm(model=model_name)
+
+
+def resolve_model(
+    model_name: Union[str, LiteLlm],
+    prompt_cache_key: Optional[str] = None
+) -> Union[str, LiteLlm]:
+    """Resolve a model spec to something ADK's Agent accepts.
+
+    Strings with a known LiteLLM provider prefix are wrapped in a memoized
+    LiteLlm instance; everything else (native model names, pre-built model
+    objects) is returned unchanged without touching the cache.
+    """
+    if isinstance(model_name, str) and model_name.startswith(_LITELLM_PREFIXES):
+        return _cached_litellm(model_name, prompt_cache_key)
+    return model_name
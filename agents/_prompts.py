@@ -0,0 +1,16 @@
+# agents/_prompts.py
+"""
+Shared prompt fragments for the banking agents.
+
+Provider prompt caches key on exact leading bytes, so all agents open with
+the same preamble literal: a single-character drift between agents would
+fragment the cache, while byte-identical openings let every sub-agent reuse
+the same cached prefix segment.
+"""
+
+BANKING_PREAMBLE = """You are an agent in a banking assistant system.
+Maintain a professional, security-focused tone at all times.
+Never make up account details, balances, or transaction results.
+Remind users to keep their financial information secure when relevant.
+
+"""
@@ -3,22 +3,14 @@ from google.adk.agents import Agent
 from google.adk.models.lite_llm import LiteLlm
 from typing import Union, Callable
 
+from ._model import resolve_model
+from ._prompts import BANKING_PREAMBLE
 
-def resolve_model(model_name: Union[str, LiteLlm]) -> Union[str, LiteLlm]:
-    if isinstance(model_name, str) and model_name.startswith(("openai/", "anthropic/")):
-        return LiteLlm(model=model_name)
-    return model_name
 
-
-def create_balance_agent(model_name: Union[str, LiteLlm], get_balance_tool: Callable) -> Agent:
-    """
-    Creates an agent specialized for handling balance inquiries.
-    """
-    return Agent(
-        name="balance_agent",
-        model=resolve_model(model_name),
-        description="Handles account balance inquiries using the get_balance tool.",
-        instruction="""
+# Static instruction prefix. Kept byte-identical across requests so provider
+# prompt caches can hit; any per-request detail (account hint, user name) must
+# be appended at the end, never inserted into this block.
+_BALANCE_INSTRUCTION = """
 You are the Balance Agent for a banking system.
 
 Your ONLY task is to:
@@ -32,6 +24,17 @@ If no account is specified, you should first ask which account they want to chec
 Always maintain a professional tone as you represent a financial institution.
 Never make up account details or balances - only use information returned by the tool.
 Remind users to keep their financial information secure.
-        """,
+        """
+
+
+def create_balance_agent(model_name: Union[str, LiteLlm], get_balance_tool: Callable) -> Agent:
+    """
+    Creates an agent specialized for handling balance inquiries.
+    """
+    return Agent(
+        name="balance_agent",
+        model=resolve_model(model_name, prompt_cache_key="balance_agent"),
+        description="Handles account balance inquiries using the get_balance tool.",
+        instruction=BANKING_PREAMBLE + _BALANCE_INSTRUCTION,
         tools=[get_balance_tool]
-    )
\ No newline at end of file
+    )
@@ -3,22 +3,13 @@ from google.adk.agents import Agent
 from google.adk.models.lite_llm import LiteLlm
 from typing import Union, Callable
 
+from ._model import resolve_model
+from ._prompts import BANKING_PREAMBLE
 
-def resolve_model(model_name: Union[str, LiteLlm]) -> Union[str, LiteLlm]:
-    if isinstance(model_name, str) and model_name.startswith(("openai/", "anthropic/")):
-        return LiteLlm(model=model_name)
-    return model_name
 
-
-def create_farewell_agent(model_name: Union[str, LiteLlm], say_goodbye_tool: Callable) -> Agent:
-    """
-    Create an agent that handles farewells.
-    """
-    return Agent(
-        name="farewell_agent",
-        model=resolve_model(model_name),
-        description="Sends polite and professional farewells to users.",
-        instruction="""
+# Static instruction prefix; keep invariant text first and append any
+# per-request variables at the end so the prompt-cache prefix stays stable.
+_FAREWELL_INSTRUCTION = """
 You are the Farewell Agent in a banking assistant system.
 
 Your ONLY task is to:
@@ -27,6 +18,17 @@ Your ONLY task is to:
 - Offer assistance if needed before closing.
 - Maintain a professional and respectful tone.
 Use the 'say_goodbye' tool to execute your task.
-        """,
+        """
+
+
+def create_farewell_agent(model_name: Union[str, LiteLlm], say_goodbye_tool: Callable) -> Agent:
+    """
+    Create an agent that handles farewells.
+    """
+    return Agent(
+        name="farewell_agent",
+        model=resolve_model(model_name, prompt_cache_key="farewell_agent"),
+        description="Sends polite and professional farewells to users.",
+        instruction=BANKING_PREAMBLE + _FAREWELL_INSTRUCTION,
         tools=[say_goodbye_tool],
-    )
\ No newline at end of file
+    )
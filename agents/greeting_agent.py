@@ -3,11 +3,22 @@ from google.adk.agents import Agent
 from google.adk.models.lite_llm import LiteLlm
 from typing import Union, Callable
 
+from ._model import resolve_model
+from ._prompts import BANKING_PREAMBLE
 
-def resolve_model(model_name: Union[str, LiteLlm]) -> Union[str, LiteLlm]:
-    if isinstance(model_name, str) and model_name.startswith(("openai/", "anthropic/")):
-        return LiteLlm(model=model_name)
-    return model_name
+
+# Static instruction prefix; keep invariant text first and append any
+# per-request variables (e.g. the user's name) at the end so the
+# prompt-cache prefix stays stable.
+_GREETING_INSTRUCTION = """
+You are the Greeting Agent for a banking system.
+
+Your ONLY task is to provide a friendly greeting to the user.
+Use the 'say_hello' tool to generate the greeting.
+If the user provides their name, make sure to pass it to the tool.
+Do not engage in any other banking conversation or tasks.
+Keep your responses friendly but professional, as you represent a bank.
+        """
 
 
 def create_greeting_agent(model_name: Union[str, LiteLlm], say_hello_tool: Callable) -> Agent:
@@ -16,16 +27,8 @@ def create_greeting_agent(model_name: Union[str, LiteLlm], say_hello_tool: Calla
     """
     return Agent(
         name="greeting_agent",
-        model=resolve_model(model_name),
+        model=resolve_model(model_name, prompt_cache_key="greeting_agent"),
         description="Handles simple greetings and welcomes using the say_hello tool.",
-        instruction="""
-You are the Greeting Agent for a banking system.
-
-Your ONLY task is to provide a friendly greeting to the user.
-Use the 'say_hello' tool to generate the greeting.
-If the user provides their name, make sure to pass it to the tool.
-Do not engage in any other banking conversation or tasks.
-Keep your responses friendly but professional, as you represent a bank.
-        """,
+        instruction=BANKING_PREAMBLE + _GREETING_INSTRUCTION,
         tools=[say_hello_tool]
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,97 @@
+# agents/registry.py
+"""
+Process-wide registry for the fully wired banking agent tree.
+
+Agent construction runs Pydantic validation for the root agent and every
+sub-agent, which is wasted work if any code path rebuilds them per request.
+The registry builds the tree exactly once per process and hands out the same
+instance afterwards.
+"""
+import functools
+import threading
+from typing import Optional
+
+from google.adk.agents import Agent
+
+_root_agent: Optional[Agent] = None
+_lock = threading.Lock()
+
+
+def get_root_agent() -> Agent:
+    """
+    Return the default banking root agent, building it on first use.
+
+    Subsequent calls return the cached instance, so callers may invoke this
+    freely on hot paths without paying agent-construction cost again.
+    """
+    global _root_agent
+
+    if _root_agent is not None:
+        return _root_agent
+
+    with _lock:
+        if _root_agent is None:
+            _root_agent = _build_root_agent()
+        return _root_agent
+
+
+def reset_registry() -> None:
+    """Drop the cached agent tree (intended for tests)."""
+    global _root_agent
+    with _lock:
+        _root_agent = None
+
+
+def _build_root_agent() -> Agent:
+    """Construct the root agent with all sub-agents, tools and guardrails."""
+    # Imported lazily to keep module import cheap and avoid circular imports
+    # with runner.py.
+    import config
+    from callbacks.before_model import InputGuard
+    from callbacks.before_tool import ToolGuard
+    from tools import (
+        say_hello,
+        say_goodbye,
+        get_balance,
+        transfer_money,
+        get_financial_advice
+    )
+
+    from . import (
+        create_root_agent,
+        create_greeting_agent,
+        create_farewell_agent,
+        create_balance_agent,
+        create_transfer_agent
+    )
+
+    greeting_agent = create_greeting_agent(config.MODELS["greeting_agent"], say_hello)
+    farewell_agent = create_farewell_agent(config.MODELS["farewell_agent"], say_goodbye)
+    balance_agent = create_balance_agent(config.MODELS["balance_agent"], get_balance)
+    transfer_agent = create_transfer_agent(config.MODELS["transfer_agent"], transfer_money)
+
+    # BLOCKED_KEYWORDS_UPPER is already uppercased and frozen, matching the
+    # uppercased text the guard scans (the raw config list is lowercase and
+    # would never have matched).
+    before_model_callback = lambda ctx, req: InputGuard.blocked_keywords_guardrail(
+        ctx, req, config.BLOCKED_KEYWORDS_UPPER
+    )
+
+    # Dispatch table keyed by tool name: unrelated tools skip the guard
+    # entirely instead of re-checking tool.name inside it.
+    before_tool_callback = ToolGuard.make_dispatcher({
+        "transfer_money": (
+            functools.partial(
+                ToolGuard.transfer_limit_guardrail,
+                transfer_limit=config.BANKING.max_transfer_amount
+            ),
+        ),
+    })
+
+    return create_root_agent(
+        model_name=config.MODELS["root_agent"],
+        sub_agents=[greeting_agent, farewell_agent, balance_agent, transfer_agent],
+        tools=[get_financial_advice],
+        before_model_callback=before_model_callback,
+        before_tool_callback=before_tool_callback
+    )
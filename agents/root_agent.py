@@ -1,26 +1,39 @@
 # agents/root_agent.py
 from google.adk.agents import Agent
 from google.adk.models.lite_llm import LiteLlm
-from typing import Union, List, Callable
+from pydantic import PrivateAttr
+from typing import Any, Dict, Optional, Union, List, Callable
 
+from ._model import resolve_model
+from ._prompts import BANKING_PREAMBLE
 
-def create_root_agent(
-    model_name: Union[str, LiteLlm],
-    sub_agents: List[Agent],
-    tools: List[Callable],
-    before_model_callback: Callable,
-    before_tool_callback: Callable
-) -> Agent:
-    """
-    Creates the main Banking Root Agent that analyzes intent and delegates to sub-agents.
+
+class RoutedAgent(Agent):
+    """Agent whose direct sub-agents are indexed by name.
+
+    BaseAgent.find_sub_agent walks the sub-agent list linearly on every
+    delegation lookup; with a name->agent dict built once after validation,
+    direct children resolve in O(1). Deeper descendants still fall back to
+    the base-class traversal.
     """
-    model = LiteLlm(model=model_name) if isinstance(model_name, str) and model_name.startswith(("openai/", "anthropic/")) else model_name
 
-    return Agent(
-        name="banking_root_agent",
-        model=model,
-        description="Main banking agent that handles financial requests and delegates to specialists.",
-        instruction="""
+    _sub_agent_map: Dict[str, Agent] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._sub_agent_map = {agent.name: agent for agent in self.sub_agents}
+
+    def find_sub_agent(self, name: str) -> Optional[Agent]:
+        direct = self._sub_agent_map.get(name)
+        if direct is not None:
+            return direct
+        return super().find_sub_agent(name)
+
+
+# Static instruction prefix for the root agent. The delegation policy is
+# invariant, so it lives in a module-level constant; anything that varies per
+# request must be appended after it to keep the prompt-cache prefix stable.
+_ROOT_INSTRUCTION = """
 You are a helpful banking assistant. Your role is to:
 
 1. Analyze the user's request and determine the appropriate action.
@@ -30,12 +43,29 @@ You are a helpful banking assistant. Your role is to:
 5. For transfers (send money, transfer funds), delegate to the 'transfer_agent'.
 6. For financial advice questions, use your knowledge to provide general guidance.
 
-Always be professional, courteous, and security-conscious. Never share account details 
+Always be professional, courteous, and security-conscious. Never share account details
 with unauthorized users. For sensitive operations, ensure proper verification.
-        """,
+        """
+
+
+def create_root_agent(
+    model_name: Union[str, LiteLlm],
+    sub_agents: List[Agent],
+    tools: List[Callable],
+    before_model_callback: Callable,
+    before_tool_callback: Callable
+) -> Agent:
+    """
+    Creates the main Banking Root Agent that analyzes intent and delegates to sub-agents.
+    """
+    return RoutedAgent(
+        name="banking_root_agent",
+        model=resolve_model(model_name, prompt_cache_key="banking_root_agent"),
+        description="Main banking agent that handles financial requests and delegates to specialists.",
+        instruction=BANKING_PREAMBLE + _ROOT_INSTRUCTION,
         tools=tools,
         sub_agents=sub_agents,
         output_key="last_response",
         before_model_callback=before_model_callback,
         before_tool_callback=before_tool_callback
-    )
\ No newline at end of file
+    )
@@ -3,22 +3,14 @@ from google.adk.agents import Agent
 from google.adk.models.lite_llm import LiteLlm
 from typing import Union, Callable
 
+from ._model import resolve_model
+from ._prompts import BANKING_PREAMBLE
 
-def resolve_model(model_name: Union[str, LiteLlm]) -> Union[str, LiteLlm]:
-    if isinstance(model_name, str) and model_name.startswith(("openai/", "anthropic/")):
-        return LiteLlm(model=model_name)
-    return model_name
 
-
-def create_transfer_agent(model_name: Union[str, LiteLlm], transfer_money_tool: Callable) -> Agent:
-    """
-    Creates an agent specialized for handling money transfers.
-    """
-    return Agent(
-        name="transfer_agent",
-        model=resolve_model(model_name),
-        description="Handles money transfers between accounts using the transfer_money tool.",
-        instruction="""
+# Static instruction prefix. The security policy below never changes between
+# requests, so keeping it in a module-level constant guarantees a stable
+# prompt-cache prefix; per-request details belong at the end of the prompt.
+_TRANSFER_INSTRUCTION = """
 You are the Transfer Agent for a banking system.
 
 Your ONLY task is to:
@@ -35,6 +27,17 @@ Important security guidelines:
 - Be vigilant about potential fraud indicators and escalate if needed.
 
 Maintain a professional, security-focused tone at all times.
-        """,
+        """
+
+
+def create_transfer_agent(model_name: Union[str, LiteLlm], transfer_money_tool: Callable) -> Agent:
+    """
+    Creates an agent specialized for handling money transfers.
+    """
+    return Agent(
+        name="transfer_agent",
+        model=resolve_model(model_name, prompt_cache_key="transfer_agent"),
+        description="Handles money transfers between accounts using the transfer_money tool.",
+        instruction=BANKING_PREAMBLE + _TRANSFER_INSTRUCTION,
         tools=[transfer_money_tool]
-    )
\ No newline at end of file
+    )
@@ -6,81 +6,131 @@ import uuid
 import uvicorn
 from fastapi import FastAPI, HTTPException, Depends, Header, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+import hashlib
+import json
 import os
 import time
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
 # Import local modules
 import config
 from runner import create_default_runner, BankingBotRunner
+from utils.clock import now_iso
+from utils.ids import new_session_id
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize for WebSocket text frames, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def _json_loads(text: str) -> Any:
+    """Deserialize a WebSocket text frame."""
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
 # Initialize the FastAPI app
 app = FastAPI(
     title="Banking Bot API",
     description="API for interacting with Banking Assistant, an intelligent agent-based system for banking operations.",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse
 )
 
-# Add CORS middleware
+# Add CORS middleware. Explicit method/header lists let Starlette precompute
+# the preflight response headers at init instead of rebuilding them per
+# OPTIONS request.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=config.API_CONFIG["cors_origins"],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=["content-type", "authorization"],
 )
 
 # Create the banking bot runner
 runner = create_default_runner()
 
-# Create templates directory if it doesn't exist
-os.makedirs("templates", exist_ok=True)
-
-# Mount static files if the directory exists
-if os.path.exists("static"):
-    app.mount("/static", StaticFiles(directory="static"), name="static")
-    templates = Jinja2Templates(directory="templates")
-else:
-    logger.warning("Static directory not found. UI features will be limited.")
-    templates = None
+# Template lookup is lazy, so constructing this without touching the
+# filesystem at import time is safe; missing templates surface on first /ui.
+templates = Jinja2Templates(directory="templates")
+
+@app.on_event("startup")
+async def mount_static_files():
+    """Mount /static once per worker, only if the directory is present."""
+    config.init_config()
+    app.state.has_static = os.path.isdir("static")
+    if app.state.has_static:
+        app.mount("/static", StaticFiles(directory="static"), name="static")
+    else:
+        logger.warning("Static directory not found. UI features will be limited.")
 
 # --- Pydantic Models for Request/Response ---
 
+# Request bodies are read-only once parsed: extra="ignore" skips
+# unknown-field bookkeeping during validation and frozen=True documents that
+# handlers never mutate them (copy with .model_copy(update=...) if needed).
+_REQUEST_MODEL_CONFIG = ConfigDict(extra="ignore", frozen=True)
+
 class MessageRequest(BaseModel):
+    model_config = _REQUEST_MODEL_CONFIG
+
     message: str
     user_id: Optional[str] = None
     session_id: Optional[str] = None
     context: Optional[Dict[str, Any]] = None
 
 class SessionRequest(BaseModel):
+    model_config = _REQUEST_MODEL_CONFIG
+
     user_id: str
     session_id: Optional[str] = None
     initial_state: Optional[Dict[str, Any]] = None
 
 class StateUpdateRequest(BaseModel):
+    model_config = _REQUEST_MODEL_CONFIG
+
     user_id: str
     session_id: str
     state_updates: Dict[str, Any]
 
 class UserSessionRequest(BaseModel):
+    model_config = _REQUEST_MODEL_CONFIG
+
     user_id: str
 
 # --- Helper Functions ---
 
-def get_session_key(request: Request) -> str:
+# Keyed hash for user-ID derivation. Unlike the builtin hash(), blake2b is
+# stable across processes (no PYTHONHASHSEED dependence), so the same client
+# maps to the same user ID on every uvicorn worker.
+_HASH_KEY = os.environb.get(b"USER_ID_KEY", b"banking-bot")[:64]
+
+# 6 bytes = 48-bit ID space; collisions stay negligible at this user scale
+# and the hex form keeps the familiar compact "user_xxxxxxxxxxxx" shape.
+_USER_ID_DIGEST_SIZE = 6
+
+def get_session_key(request: Request) -> bytes:
     """Generate a deterministic session key from the request."""
     # In production, you'd likely use authentication to get user ID
     user_agent = request.headers.get("user-agent", "unknown")
     ip = request.client.host if request.client else "unknown"
-    return f"{ip}_{user_agent}"
+    return ip.encode() + b"\0" + user_agent.encode()
 
 def get_or_create_user_id(request: Request = None, user_id: str = None) -> str:
     """Get user ID from request/parameter or generate a new one."""
@@ -88,7 +138,10 @@ def get_or_create_user_id(request: Request = None, user_id: str = None) -> str:
         return user_id
     elif request:
         # Generate deterministic user ID from request info
-        return f"user_{hash(get_session_key(request)) % 10000000}"
+        digest = hashlib.blake2b(
+            get_session_key(request), key=_HASH_KEY, digest_size=_USER_ID_DIGEST_SIZE
+        ).hexdigest()
+        return f"user_{digest}"
     else:
         return f"user_{uuid.uuid4().hex[:8]}"
 
@@ -120,7 +173,7 @@ async def chat(request: MessageRequest):
     If user_id and session_id are not provided, they will be generated.
     """
     user_id = get_or_create_user_id(user_id=request.user_id)
-    session_id = request.session_id or f"session_{uuid.uuid4().hex}"
+    session_id = request.session_id or new_session_id()
     
     try:
         response = await runner.process_message(
@@ -131,7 +184,7 @@ async def chat(request: MessageRequest):
         )
         
         # Add timing information
-        response["timestamp"] = datetime.now().isoformat()
+        response["timestamp"] = now_iso()
         response["user_id"] = user_id
         response["session_id"] = session_id
         
@@ -141,6 +194,33 @@ async def chat(request: MessageRequest):
         logger.error(f"Error processing message: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
 
+@app.post(f"{config.API_CONFIG['api_prefix']}/chat/stream")
+async def chat_stream(request: MessageRequest):
+    """
+    Send a message and stream the response as server-sent events.
+
+    Emits 'chunk' events as tokens arrive and a final 'done' event, so
+    clients can render the reply progressively instead of waiting for the
+    full generation.
+    """
+    user_id = get_or_create_user_id(user_id=request.user_id)
+    session_id = request.session_id or new_session_id()
+
+    async def event_stream():
+        async for chunk in runner.stream_message(
+            user_id=user_id,
+            session_id=session_id,
+            message=request.message,
+            context=request.context
+        ):
+            yield f"data: {_json_dumps(chunk)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post(f"{config.API_CONFIG['api_prefix']}/sessions")
 async def create_session(request: SessionRequest):
     """Create a new session for a user."""
@@ -236,15 +316,29 @@ async def delete_session(user_id: str, session_id: str):
 
 # --- UI Routes ---
 
+_index_template = None
+
+def _get_index_template():
+    """Fetch the parsed index.html template once and reuse it."""
+    # templates.TemplateResponse re-resolves the template per request;
+    # Jinja2's env caches the compiled AST, but going through the env lookup
+    # and Response plumbing each time is avoidable for a mostly static page.
+    global _index_template
+    if _index_template is None:
+        _index_template = templates.env.get_template("index.html")
+    return _index_template
+
 @app.get("/ui")
 async def ui_home(request: Request):
     """Serve the web UI for the Banking Bot."""
-    if not templates:
+    try:
+        template = _get_index_template()
+    except Exception:
         return JSONResponse(
             status_code=404,
             content={"message": "UI not available. Templates directory not found."}
         )
-    
+
     user_id = get_or_create_user_id(request)
     
     # Create a default session if none exists
@@ -261,17 +355,15 @@ async def ui_home(request: Request):
             session_id = sessions[0]["session_id"]
     except Exception as e:
         logger.error(f"Error setting up UI session: {e}", exc_info=True)
-        session_id = f"session_{uuid.uuid4().hex}"
+        session_id = new_session_id()
     
-    return templates.TemplateResponse(
-        "index.html", 
-        {
-            "request": request, 
-            "user_id": user_id,
-            "session_id": session_id,
-            "welcome_message": config.BANKING_CONFIG["welcome_message"]
-        }
+    html = template.render(
+        request=request,
+        user_id=user_id,
+        session_id=session_id,
+        welcome_message=config.BANKING.welcome_message
     )
+    return HTMLResponse(html)
 
 # --- WebSocket for Real-time Chat ---
 
@@ -281,29 +373,32 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str, session_id: str
     await websocket.accept()
     
     try:
-        # Check if session exists or create it
-        session_info = await runner.get_session_info(user_id, session_id)
-        if not session_info:
-            await runner.create_session(user_id, session_id, {"source": "websocket"})
-        
-        # Send welcome message
-        await websocket.send_json({
+        # Pipeline connection setup: the welcome payload does not depend on
+        # session state, so send it while the session lookup is in flight
+        # instead of serializing lookup -> (create) -> welcome.
+        info_task = asyncio.create_task(runner.get_session_info(user_id, session_id))
+        welcome_task = asyncio.create_task(websocket.send_text(_json_dumps({
             "type": "welcome",
-            "content": config.BANKING_CONFIG["welcome_message"],
+            "content": config.BANKING.welcome_message,
             "user_id": user_id,
             "session_id": session_id
-        })
+        })))
+
+        session_info = await info_task
+        if not session_info:
+            await runner.create_session(user_id, session_id, {"source": "websocket"})
+        await welcome_task
         
         # Main conversation loop
         while True:
             # Receive message from client
-            data = await websocket.receive_json()
-            
+            data = _json_loads(await websocket.receive_text())
+
             if "message" not in data:
-                await websocket.send_json({
+                await websocket.send_text(_json_dumps({
                     "type": "error",
                     "content": "Invalid message format. Missing 'message' field."
-                })
+                }))
                 continue
             
             # Process message
@@ -315,22 +410,22 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str, session_id: str
             )
             
             # Send response back to client
-            await websocket.send_json({
+            await websocket.send_text(_json_dumps({
                 "type": "response",
                 "content": response["response_text"],
                 "full_response": response,
-                "timestamp": datetime.now().isoformat()
-            })
+                "timestamp": now_iso()
+            }))
             
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected: {user_id}/{session_id}")
     except Exception as e:
         logger.error(f"WebSocket error: {e}", exc_info=True)
         try:
-            await websocket.send_json({
+            await websocket.send_text(_json_dumps({
                 "type": "error",
                 "content": f"An error occurred: {str(e)}"
-            })
+            }))
         except:
             pass  # Client likely already disconnected
 
@@ -341,179 +436,42 @@ async def health_check():
     """Health check endpoint."""
     return {
         "status": "ok",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now_iso(),
         "config": {
             "app_name": config.APP_NAME,
             "session_type": config.SESSION_TYPE
-        }
+        },
+        "response_cache": runner.cache_stats()
     }
 
 # --- Main Entry Point ---
 
-def create_sample_templates():
-    """Create simple templates for UI if they don't exist."""
-    if not os.path.exists("templates"):
-        os.makedirs("templates", exist_ok=True)
-    
-    # Create a simple index.html if it doesn't exist
-    index_path = os.path.join("templates", "index.html")
-    if not os.path.exists(index_path):
-        with open(index_path, "w") as f:
-            f.write("""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Banking Bot</title>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        body { font-family: Arial, sans-serif; margin: 0; padding: 20px; max-width: 800px; margin: 0 auto; }
-        .chat-container { border: 1px solid #ddd; border-radius: 8px; overflow: hidden; display: flex; flex-direction: column; height: 80vh; }
-        .chat-header { background-color: #0066cc; color: white; padding: 10px; text-align: center; }
-        .messages { flex: 1; overflow-y: auto; padding: 15px; display: flex; flex-direction: column; gap: 10px; }
-        .message { padding: 10px; border-radius: 18px; max-width: 70%; }
-        .user { align-self: flex-end; background-color: #0084ff; color: white; }
-        .bot { align-self: flex-start; background-color: #e9e9eb; color: black; }
-        .input-area { display: flex; padding: 10px; border-top: 1px solid #ddd; }
-        #message-input { flex: 1; padding: 10px; border: 1px solid #ddd; border-radius: 4px; }
-        #send-button { background-color: #0066cc; color: white; border: none; padding: 10px 15px; margin-left: 10px; border-radius: 4px; cursor: pointer; }
-        .session-info { font-size: 0.8em; color: #666; margin-top: 10px; }
-    </style>
-</head>
-<body>
-    <div class="chat-container">
-        <div class="chat-header">
-            <h2>Banking Assistant</h2>
-        </div>
-        <div class="messages" id="messages"></div>
-        <div class="input-area">
-            <input type="text" id="message-input" placeholder="Type your message here..." />
-            <button id="send-button">Send</button>
-        </div>
-    </div>
-    <div class="session-info">
-        User ID: <span id="user-id">{{ user_id }}</span> | 
-        Session ID: <span id="session-id">{{ session_id }}</span>
-    </div>
-
-    <script>
-        const userId = "{{ user_id }}";
-        const sessionId = "{{ session_id }}";
-        const messagesContainer = document.getElementById('messages');
-        const messageInput = document.getElementById('message-input');
-        const sendButton = document.getElementById('send-button');
-        let ws;
-        
-        // Add welcome message
-        const welcomeMsg = "{{ welcome_message }}";
-        addBotMessage(welcomeMsg);
-        
-        // Initialize WebSocket
-        function connectWebSocket() {
-            ws = new WebSocket(`ws://${window.location.host}/ws/${userId}/${sessionId}`);
-            
-            ws.onopen = function() {
-                console.log('WebSocket connected');
-            };
-            
-            ws.onmessage = function(event) {
-                const data = JSON.parse(event.data);
-                if (data.type === 'response') {
-                    addBotMessage(data.content);
-                } else if (data.type === 'error') {
-                    addBotMessage('Error: ' + data.content);
-                } else if (data.type === 'welcome') {
-                    // Already added welcome message
-                }
-            };
-            
-            ws.onclose = function() {
-                console.log('WebSocket disconnected');
-                // Try to reconnect after a delay
-                setTimeout(connectWebSocket, 3000);
-            };
-            
-            ws.onerror = function(error) {
-                console.error('WebSocket error:', error);
-            };
-        }
-        
-        // Send message
-        function sendMessage() {
-            const text = messageInput.value.trim();
-            if (!text) return;
-            
-            addUserMessage(text);
-            
-            if (ws && ws.readyState === WebSocket.OPEN) {
-                ws.send(JSON.stringify({ message: text }));
-            } else {
-                // Fallback to REST API if WebSocket isn't connected
-                fetch(`${window.location.origin}/api/chat`, {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ message: text, user_id: userId, session_id: sessionId })
-                })
-                .then(response => response.json())
-                .then(data => {
-                    addBotMessage(data.response_text);
-                })
-                .catch(error => {
-                    console.error('Error:', error);
-                    addBotMessage('Sorry, there was an error processing your request.');
-                });
-            }
-            
-            messageInput.value = '';
-        }
-        
-        // Add a user message to the chat
-        function addUserMessage(text) {
-            const message = document.createElement('div');
-            message.classList.add('message', 'user');
-            message.textContent = text;
-            messagesContainer.appendChild(message);
-            scrollToBottom();
-        }
-        
-        // Add a bot message to the chat
-        function addBotMessage(text) {
-            const message = document.createElement('div');
-            message.classList.add('message', 'bot');
-            message.textContent = text;
-            messagesContainer.appendChild(message);
-            scrollToBottom();
-        }
-        
-        // Scroll to the bottom of the messages container
-        function scrollToBottom() {
-            messagesContainer.scrollTop = messagesContainer.scrollHeight;
-        }
-        
-        // Event listeners
-        sendButton.addEventListener('click', sendMessage);
-        messageInput.addEventListener('keypress', function(e) {
-            if (e.key === 'Enter') {
-                sendMessage();
-            }
-        });
-        
-        // Connect WebSocket when the page loads
-        connectWebSocket();
-    </script>
-</body>
-</html>
-            """)
-        logger.info(f"Created sample template: {index_path}")
-
 if __name__ == "__main__":
-    # Create sample templates for UI
-    create_sample_templates()
-    
-    # Start the API server
+    # templates/index.html is version-controlled; no runtime generation.
+    # Start the API server. A generous keep-alive window lets the browser's
+    # REST fallback reuse the TCP+TLS connection it already holds instead of
+    # re-handshaking between messages. (uvicorn has no HTTP/2 support; run
+    # behind hypercorn or an h2-terminating proxy if multiplexing is needed.)
+    # Prefer the C-accelerated event loop and HTTP parser when installed;
+    # both are drop-in and worth real single-core throughput on Linux.
+    try:
+        import uvloop  # noqa: F401
+        loop_impl = "uvloop"
+    except ImportError:
+        loop_impl = "auto"
+    try:
+        import httptools  # noqa: F401
+        http_impl = "httptools"
+    except ImportError:
+        http_impl = "auto"
+
     uvicorn.run(
-        "app:app", 
-        host=config.API_CONFIG["host"], 
+        "app:app",
+        host=config.API_CONFIG["host"],
         port=config.API_CONFIG["port"],
-        reload=config.API_CONFIG["debug"]
+        reload=config.API_CONFIG["debug"],
+        loop=loop_impl,
+        http=http_impl,
+        ws="websockets",
+        timeout_keep_alive=30
     )
\ No newline at end of file
@@ -2,8 +2,8 @@
 import streamlit as st
 import requests
 import json
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 import uuid
 import os
@@ -13,12 +13,21 @@ import altair as alt
 from typing import Dict, Any, List, Optional, Union, Tuple
 import asyncio
 import aiohttp
-import threading
-from collections import defaultdict
+from collections import Counter
 import logging
 import base64
+import atexit
+import threading
 from io import BytesIO
 
+try:
+    # Faster C event loop for all the asyncio.run() calls below; harmless to
+    # skip on platforms where uvloop isn't available.
+    import uvloop
+    uvloop.install()
+except ImportError:  # pragma: no cover
+    pass
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -41,8 +50,12 @@ if 'user_id' not in st.session_state:
     st.session_state.user_id = f"streamlit_user_{uuid.uuid4().hex[:8]}"
 if 'session_id' not in st.session_state:
     st.session_state.session_id = f"session_{uuid.uuid4().hex}"
-if 'messages' not in st.session_state:
-    st.session_state.messages = []
+if 'msg_roles' not in st.session_state:
+    # Chat history kept as parallel role/content lists (structure-of-arrays)
+    # rather than a list of per-message dicts; cheaper to append to and to
+    # iterate on every rerun as conversations grow.
+    st.session_state.msg_roles = []
+    st.session_state.msg_contents = []
 if 'authenticated' not in st.session_state:
     st.session_state.authenticated = False
 if 'metrics_data' not in st.session_state:
@@ -52,7 +65,7 @@ if 'historical_metrics' not in st.session_state:
 if 'error' not in st.session_state:
     st.session_state.error = None
 if 'tool_calls' not in st.session_state:
-    st.session_state.tool_calls = defaultdict(int)
+    st.session_state.tool_calls = Counter()
 if 'token_usage' not in st.session_state:
     st.session_state.token_usage = {'in': 0, 'out': 0}
 if 'active_tab' not in st.session_state:
@@ -61,15 +74,120 @@ if 'last_refresh' not in st.session_state:
     st.session_state.last_refresh = time.time()
 
 # Helper functions
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """One pooled HTTP session for all API calls, shared across reruns.
+
+    A bare requests.post opens a fresh TCP connection per call; keeping a
+    Session alive in the resource cache reuses keepalive connections to the
+    backend for the whole Streamlit process.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=16,
+        max_retries=requests.adapters.Retry(
+            total=2,
+            backoff_factor=0.1,
+            allowed_methods=["GET"]  # retry only idempotent calls
+        )
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+HTTP = get_http_session()
+
+@st.cache_resource
+def _aio_runtime():
+    """One event loop plus pooled aiohttp session for the whole process.
+
+    asyncio.run() would spin up a fresh loop and a fresh ClientSession per
+    call, re-creating the connector and re-resolving DNS on every metrics
+    refresh. The loop runs forever on its own daemon thread and callers
+    submit work with run_coroutine_threadsafe: the cached resource is shared
+    across Streamlit sessions, each of which runs its script on a different
+    thread, so driving the loop directly with run_until_complete from those
+    threads would collide as soon as two sessions overlap.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="aio-runtime", daemon=True).start()
+
+    async def _make_session():
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=16, keepalive_timeout=60)
+        )
+
+    session = asyncio.run_coroutine_threadsafe(_make_session(), loop).result()
+
+    def _close():
+        if not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(session.close(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+
+    atexit.register(_close)
+    return loop, session
+
+def run_async(coro):
+    """Submit a coroutine to the shared loop thread and wait for its result.
+
+    The loop thread has no ScriptRunContext, so st.session_state there
+    resolves to a process-global stand-in rather than this user's session.
+    Coroutines therefore only do network I/O and return results; the
+    caller applies them to session_state on this (script) thread.
+    """
+    loop, _ = _aio_runtime()
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+async def _put_session_updates(updates, history_etag=None, refresh_metrics=True):
+    """PUT session-state updates in parallel, overlapped with a metrics refresh.
+
+    The backend has no batch endpoint yet, so independent updates are
+    gathered on the shared aiohttp session; the login/logout paths pay one
+    round-trip of latency instead of a session write followed by two
+    metrics fetches.
+    """
+    _, session = _aio_runtime()
+
+    async def _put(update):
+        async with session.put(
+            f"{API_BASE_URL}/api/sessions/{update['user_id']}/{update['session_id']}",
+            json=update,
+            timeout=API_TIMEOUT
+        ) as response:
+            response.raise_for_status()
+            return response.status
+
+    coros = [_put(u) for u in updates]
+    if refresh_metrics:
+        coros.append(fetch_metrics_async(history_etag))
+    results = await asyncio.gather(*coros, return_exceptions=True)
+    for result in results[:len(updates)]:
+        if isinstance(result, Exception):
+            raise result
+    return results
+
+def apply_session_updates(updates, refresh_metrics=True):
+    """Run the session PUTs on the loop thread, then apply metrics here.
+
+    Returns the PUT statuses and raises the first PUT failure; the
+    bundled metrics results are written to session_state on this thread.
+    """
+    etag = st.session_state.get("history_etag") if refresh_metrics else None
+    results = run_async(_put_session_updates(updates, etag, refresh_metrics))
+    if refresh_metrics and not isinstance(results[-1], Exception):
+        _apply_metrics_results(*results[-1])
+    return results[:len(updates)]
+
 def reset_conversation():
     """Reset the conversation history."""
-    if 'messages' in st.session_state:
-        st.session_state.messages = []
+    st.session_state.msg_roles = []
+    st.session_state.msg_contents = []
     # Generate a new session ID
     st.session_state.session_id = f"session_{uuid.uuid4().hex}"
     # Create a new session via API
     try:
-        response = requests.post(
+        response = HTTP.post(
             f"{API_BASE_URL}/api/sessions",
             json={
                 "user_id": st.session_state.user_id,
@@ -84,48 +202,319 @@ def reset_conversation():
         logger.error(f"Session creation error: {str(e)}")
         st.session_state.error = str(e)
 
-async def fetch_metrics_async():
-    """Fetch metrics data asynchronously."""
-    async with aiohttp.ClientSession() as session:
-        try:
-            # Fetch current metrics
-            async with session.get(f"{API_BASE_URL}/health", timeout=API_TIMEOUT) as response:
-                if response.status == 200:
-                    metrics = await response.json()
-                    st.session_state.metrics_data = metrics
-                    st.session_state.last_refresh = time.time()
-                    logger.info("Metrics data refreshed successfully")
-                else:
-                    logger.error(f"Failed to fetch metrics: {response.status}")
-
-            # Fetch historical metrics if available
-            async with session.get(f"{API_BASE_URL}/api/metrics/history", timeout=API_TIMEOUT) as response:
-                if response.status == 200:
-                    history = await response.json()
-                    st.session_state.historical_metrics = history.get("data", [])
-                    logger.info(f"Fetched {len(st.session_state.historical_metrics)} historical metrics records")
-        except Exception as e:
-            logger.error(f"Error fetching metrics: {str(e)}")
-            # Don't update session state error to avoid interrupting the user experience
+async def _fetch_health(session: aiohttp.ClientSession):
+    """GET /health, returning (status, payload-or-None)."""
+    async with session.get(f"{API_BASE_URL}/health", timeout=API_TIMEOUT) as response:
+        payload = await response.json() if response.status == 200 else None
+        return response.status, payload
+
+@st.cache_data(ttl=REFRESH_INTERVAL, max_entries=8)
+def _parse_history(raw_text: str, etag: Optional[str]):
+    """Decode the history payload once per (body, ETag); 10 s TTL."""
+    return json.loads(raw_text).get("data", [])
+
+async def _fetch_history(session: aiohttp.ClientSession, etag: Optional[str]):
+    """GET /api/metrics/history, returning (status, raw-body-or-None, etag).
+
+    Sends If-None-Match with the caller's last seen ETag so an unchanged
+    history costs a 304 with no body to download or decode. The body is
+    returned undecoded; the script thread parses and stores it.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+
+    async with session.get(
+        f"{API_BASE_URL}/api/metrics/history",
+        timeout=API_TIMEOUT,
+        headers=headers
+    ) as response:
+        if response.status == 304:
+            # Unchanged; caller keeps the cached historical_metrics.
+            return 304, None, etag
+        if response.status != 200:
+            return response.status, None, None
+        raw_text = await response.text()
+        return 200, raw_text, response.headers.get("ETag")
+
+async def fetch_metrics_async(history_etag: Optional[str] = None):
+    """Fetch current and historical metrics concurrently.
+
+    Returns the [health_result, history_result] pair (exceptions included)
+    for the caller to apply via _apply_metrics_results.
+    """
+    _, session = _aio_runtime()
+    # The two endpoints are independent; overlapping them makes the
+    # refresh cost max(t_health, t_history) instead of their sum.
+    return await asyncio.gather(
+        _fetch_health(session),
+        _fetch_history(session, history_etag),
+        return_exceptions=True
+    )
+
+# Exponential backoff on consecutive refresh failures, capped at 2**5 periods.
+_BACKOFF_MAX_EXP = 5
+
+def _record_refresh_failure():
+    """Lengthen the pause between polls after consecutive refresh failures."""
+    failures = st.session_state.get("metrics_failures", 0) + 1
+    st.session_state.metrics_failures = failures
+    delay = REFRESH_INTERVAL * 2 ** min(failures, _BACKOFF_MAX_EXP)
+    st.session_state.metrics_backoff_until = time.monotonic() + delay
+    logger.warning(f"Metrics refresh failed {failures}x; backing off {delay}s")
+
+def _apply_metrics_results(health_result, history_result):
+    """Push gathered health/history results into session_state.
 
-def format_message(msg):
+    Runs on the script thread, which owns the real per-session state.
+    """
+    if isinstance(health_result, Exception):
+        logger.error(f"Error fetching metrics: {health_result}")
+        _record_refresh_failure()
+    else:
+        status, metrics = health_result
+        if metrics is not None:
+            st.session_state.metrics_data = metrics
+            st.session_state.last_refresh = time.time()
+            st.session_state.metrics_failures = 0
+            st.session_state.metrics_backoff_until = 0.0
+            logger.info("Metrics data refreshed successfully")
+        else:
+            logger.error(f"Failed to fetch metrics: {status}")
+            _record_refresh_failure()
+
+    if isinstance(history_result, Exception):
+        logger.error(f"Error fetching metrics history: {history_result}")
+    else:
+        status, raw_text, etag = history_result
+        if raw_text is not None:
+            st.session_state.history_etag = etag
+            st.session_state.historical_metrics = _parse_history(raw_text, etag)
+            logger.info(f"Fetched {len(st.session_state.historical_metrics)} historical metrics records")
+        elif status == 304:
+            logger.debug("Metrics history unchanged (304); keeping cached records")
+
+def refresh_metrics():
+    """Fetch metrics on the loop thread and apply them to session_state here."""
+    health_result, history_result = run_async(
+        fetch_metrics_async(st.session_state.get("history_etag"))
+    )
+    _apply_metrics_results(health_result, history_result)
+
+async def _chat_and_metrics(message: str, user_id: str, session_id: str,
+                            history_etag: Optional[str]):
+    """POST a chat message overlapped with a metrics refresh on one session.
+
+    Returns the [chat_result, health_result, history_result] triple
+    (exceptions included) for the script thread to unpack and apply.
+    """
+    async def _post_chat(session: aiohttp.ClientSession):
+        async with session.post(
+            f"{API_BASE_URL}/api/chat",
+            json={
+                "message": message,
+                "user_id": user_id,
+                "session_id": session_id
+            },
+            timeout=API_TIMEOUT
+        ) as response:
+            payload = await response.json() if response.status == 200 else None
+            return response.status, payload
+
+    _, session = _aio_runtime()
+    return await asyncio.gather(
+        _post_chat(session),
+        _fetch_health(session),
+        _fetch_history(session, history_etag),
+        return_exceptions=True
+    )
+
+def send_chat(message: str):
+    """POST a chat message and refresh metrics on one aiohttp session.
+
+    The chat round-trip and the metrics refresh are overlapped, so a message
+    costs one backend RTT instead of chat RTT followed by two metrics RTTs.
+
+    Returns:
+        (status, payload) of the chat call; payload is None on non-200.
+    """
+    chat_result, health_result, history_result = run_async(_chat_and_metrics(
+        message,
+        st.session_state.user_id,
+        st.session_state.session_id,
+        st.session_state.get("history_etag")
+    ))
+    _apply_metrics_results(health_result, history_result)
+    if isinstance(chat_result, Exception):
+        raise chat_result
+    return chat_result
+
+def stream_chat(message: str):
+    """Yield assistant text chunks from the backend's SSE streaming endpoint.
+
+    A sync generator (suitable for st.write_stream) over the pooled HTTP
+    session; tokens render as they arrive instead of after full generation.
+    """
+    with HTTP.post(
+        f"{API_BASE_URL}/api/chat/stream",
+        json={
+            "message": message,
+            "user_id": st.session_state.user_id,
+            "session_id": st.session_state.session_id
+        },
+        stream=True,
+        timeout=API_TIMEOUT
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line or not line.startswith(b"data: "):
+                continue
+            event = json.loads(line[len(b"data: "):])
+            if event.get("type") == "chunk" and event.get("text"):
+                yield event["text"]
+            elif event.get("type") == "error":
+                raise RuntimeError(event.get("error", "stream error"))
+
+@st.fragment(run_every=REFRESH_INTERVAL)
+def metrics_panel():
+    """System-metrics cards that repaint on their own timer.
+
+    As a fragment, only this panel reruns every REFRESH_INTERVAL; the rest of
+    the page (chat history, other tabs) is untouched, and no background
+    thread has to mutate session_state from outside the script context.
+    """
+    # Honor the error backoff so an unreachable backend isn't hammered on
+    # every timer tick; the window resets on the first successful refresh.
+    if (st.session_state.get("auto_refresh", True)
+            and time.monotonic() >= st.session_state.get("metrics_backoff_until", 0.0)):
+        refresh_metrics()
+
+    metrics_cols = st.columns(4)
+
+    metrics_data = st.session_state.metrics_data.get("config", {})
+    current_metrics = st.session_state.metrics_data.get("status", "unknown")
+    timestamp = st.session_state.metrics_data.get("timestamp", datetime.now().isoformat())
+
+    with metrics_cols[0]:
+        st.markdown(
+            """
+            <div class="metrics-card">
+                <div class="metric-label">System Status</div>
+                <div class="metric-value">""" + current_metrics + """</div>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+
+    with metrics_cols[1]:
+        st.markdown(
+            """
+            <div class="metrics-card">
+                <div class="metric-label">Total Requests</div>
+                <div class="metric-value">""" + str(len(st.session_state.msg_roles) // 2) + """</div>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+
+    with metrics_cols[2]:
+        st.markdown(
+            """
+            <div class="metrics-card">
+                <div class="metric-label">Last Updated</div>
+                <div class="metric-value">""" + _fmt_ts(timestamp) + """</div>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+
+    with metrics_cols[3]:
+        st.markdown(
+            """
+            <div class="metrics-card">
+                <div class="metric-label">Session Type</div>
+                <div class="metric-value">""" + metrics_data.get("session_type", "unknown") + """</div>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+
+@st.cache_data(max_entries=64)
+def _fmt_ts(iso: str) -> str:
+    """Memoized ISO-timestamp -> HH:MM:SS; same input skips the parse."""
+    return datetime.fromisoformat(iso).strftime("%H:%M:%S")
+
+@st.cache_data(max_entries=8)
+def _download_href(state_json: str) -> str:
+    """Memoized data-URI link so base64 encoding only runs when state changes."""
+    b64 = base64.b64encode(state_json.encode()).decode()
+    return f'<a href="data:application/json;base64,{b64}" download="session_state.json">Download Session State as JSON</a>'
+
+def format_message(role, content):
     """Format message with appropriate styling."""
-    if msg["role"] == "user":
-        return f"You: {msg['content']}"
+    if role == "user":
+        return f"You: {content}"
     else:
-        return f"Assistant: {msg['content']}"
+        return f"Assistant: {content}"
 
-def create_line_chart(data, x_key, y_key, title, color_scheme='viridis'):
-    """Create a line chart visualization."""
-    if not data:
-        return None
-    
-    df = pd.DataFrame(data)
-    if x_key not in df.columns or y_key not in df.columns:
-        return None
-    
-    fig = px.line(df, x=x_key, y=y_key, title=title)
+# Cap on points per line trace; longer series are LTTB-downsampled first.
+_CHART_MAX_POINTS = 500
+
+def _lttb(xs, ys, threshold=_CHART_MAX_POINTS):
+    """Downsample a series with Largest-Triangle-Three-Buckets.
+
+    Keeps the visually significant points (local extrema, trend changes)
+    so charts stay readable while render cost stays bounded as the
+    metrics history grows.
+    """
+    n = len(ys)
+    if threshold >= n or threshold < 3:
+        return xs, ys
+
+    # Triangle areas need numeric x; datetime64 converts losslessly.
+    x_num = xs.astype(np.float64) if xs.dtype.kind in 'fiu' else xs.astype('int64').astype(np.float64)
+    y_num = ys.astype(np.float64)
+
+    # First and last points are always kept; bucket the interior.
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    kept = [0]
+    prev = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if lo >= hi:
+            continue
+        # Average of the next bucket acts as the third triangle vertex.
+        nlo, nhi = edges[i + 1], edges[min(i + 2, threshold - 2)]
+        avg_x = x_num[nlo:max(nhi, nlo + 1)].mean()
+        avg_y = y_num[nlo:max(nhi, nlo + 1)].mean()
+        areas = np.abs(
+            (x_num[prev] - avg_x) * (y_num[lo:hi] - y_num[prev])
+            - (x_num[prev] - x_num[lo:hi]) * (avg_y - y_num[prev])
+        )
+        prev = lo + int(np.argmax(areas))
+        kept.append(prev)
+    kept.append(n - 1)
+    idx = np.asarray(kept)
+    return xs[idx], ys[idx]
+
+@st.cache_data(ttl=REFRESH_INTERVAL, max_entries=32)
+def _build_line_chart(points: Tuple[Tuple[Any, Any], ...], x_key, y_key, title):
+    """Cached figure construction; Streamlit reruns skip this on same data."""
+    # Typed numpy arrays let plotly serialize traces via its compact
+    # base64 typed-array path instead of element-by-element JSON.
+    ys = np.asarray([p[1] for p in points], dtype=np.float32)
+    raw_x = [p[0] for p in points]
+    try:
+        xs = np.asarray(raw_x, dtype='datetime64[ms]')
+    except (ValueError, TypeError):
+        xs = np.asarray(raw_x)
+
+    if len(ys) > _CHART_MAX_POINTS and xs.dtype.kind in 'Mfiu':
+        xs, ys = _lttb(xs, ys)
+
+    fig = go.Figure(data=[go.Scatter(x=xs, y=ys, mode='lines')])
     fig.update_layout(
+        title=title,
         template="plotly_white",
         xaxis_title=x_key.replace('_', ' ').title(),
         yaxis_title=y_key.replace('_', ' ').title(),
@@ -134,9 +523,28 @@ def create_line_chart(data, x_key, y_key, title, color_scheme='viridis'):
     )
     return fig
 
-def create_bar_chart(data, labels, values, title, color='lightblue'):
-    """Create a bar chart visualization."""
-    fig = go.Figure(data=[go.Bar(x=labels, y=values, marker_color=color)])
+def create_line_chart(data, x_key, y_key, title, color_scheme='viridis'):
+    """Create a line chart visualization."""
+    if not data:
+        return None
+
+    try:
+        # Normalize to a hashable tuple so identical data hits the cache
+        # instead of rebuilding the DataFrame and Figure every rerun.
+        points = tuple((d[x_key], d[y_key]) for d in data)
+    except (KeyError, TypeError):
+        return None
+
+    return _build_line_chart(points, x_key, y_key, title)
+
+@st.cache_data(ttl=REFRESH_INTERVAL, max_entries=32)
+def _build_bar_chart(labels: Tuple, values: Tuple, title, color):
+    """Cached bar-figure construction keyed on the (labels, values) tuples."""
+    fig = go.Figure(data=[go.Bar(
+        x=list(labels),
+        y=np.asarray(values, dtype=np.float32),
+        marker_color=color
+    )])
     fig.update_layout(
         title=title,
         template="plotly_white",
@@ -147,10 +555,14 @@ def create_bar_chart(data, labels, values, title, color='lightblue'):
     )
     return fig
 
+def create_bar_chart(data, labels, values, title, color='lightblue'):
+    """Create a bar chart visualization."""
+    return _build_bar_chart(tuple(labels), tuple(values), title, color)
+
 def fetch_session_state():
     """Fetch current session state from the API."""
     try:
-        response = requests.get(
+        response = HTTP.get(
             f"{API_BASE_URL}/api/sessions/{st.session_state.user_id}/{st.session_state.session_id}",
             timeout=API_TIMEOUT
         )
@@ -169,16 +581,17 @@ def update_metrics_from_response(response_data):
     if not response_data:
         return
     
-    # Update tool calls
-    tool_calls = response_data.get("tool_calls", [])
-    for tool_call in tool_calls:
-        tool_name = tool_call.get("tool", "unknown")
-        st.session_state.tool_calls[tool_name] += 1
+    # Update tool calls in one Counter pass
+    st.session_state.tool_calls.update(
+        tool_call.get("tool", "unknown")
+        for tool_call in response_data.get("tool_calls", [])
+    )
     
     # Could also update token usage, latency, etc. if available in the response
 
-# Custom CSS
-st.markdown("""
+# Custom CSS, hoisted to a module constant so the same string object is
+# handed to st.markdown every rerun (stable for delta-diffing).
+_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem !important;
@@ -250,7 +663,50 @@ st.markdown("""
         background-color: #1565C0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Sidebar footer, likewise static.
+_FOOTER_HTML = """
+    <div class="footer">
+        ADK Banking Bot v1.0<br>
+        © 2025 Your Bank
+    </div>
+    """
+
+# Tool catalogue for the Tools tab: static, so the markdown bodies are
+# interpolated once at import rather than on each rerun.
+_TOOLS_DATA = [
+    {
+        "name": "Get Account Balance",
+        "description": "Fetches the current balance for a specified account.",
+        "usage": "Ask about your balance in checking, savings, or other accounts.",
+        "example": "What's my checking account balance?"
+    },
+    {
+        "name": "Transfer Money",
+        "description": "Transfers funds between accounts.",
+        "usage": "Specify source account, destination account, and amount.",
+        "example": "Transfer $100 from my checking to my savings account."
+    },
+    {
+        "name": "Financial Advisor",
+        "description": "Provides financial advice on various topics.",
+        "usage": "Ask for advice on savings, investments, or retirement planning.",
+        "example": "What's a good investment strategy for a moderate risk profile?"
+    }
+]
+
+_TOOL_DESCRIPTIONS = [
+    (
+        tool["name"],
+        f"**Description:** {tool['description']}\n\n"
+        f"**Usage:** {tool['usage']}\n\n"
+        f"**Example:** *{tool['example']}*"
+    )
+    for tool in _TOOLS_DATA
+]
+
+st.markdown(_CSS, unsafe_allow_html=True)
 
 # Sidebar
 with st.sidebar:
@@ -261,29 +717,26 @@ with st.sidebar:
     auth_expander = st.expander("Authentication", expanded=not st.session_state.authenticated)
     with auth_expander:
         if not st.session_state.authenticated:
-            auth_username = st.text_input("Username", "demo_user")
-            auth_password = st.text_input("Password", "demo_password", type="password")
-            
-            if st.button("Login"):
+            with st.form("login_form"):
+                auth_username = st.text_input("Username", "demo_user")
+                auth_password = st.text_input("Password", "demo_password", type="password")
+                login_submitted = st.form_submit_button("Login")
+
+            if login_submitted:
                 # In a real app, this would validate credentials against a database
                 # For demo, accept any non-empty username/password
                 if auth_username and auth_password:
                     st.session_state.authenticated = True
                     # Update session state via API
                     try:
-                        response = requests.put(
-                            f"{API_BASE_URL}/api/sessions/{st.session_state.user_id}/{st.session_state.session_id}",
-                            json={
-                                "user_id": st.session_state.user_id,
-                                "session_id": st.session_state.session_id,
-                                "state_updates": {"user_authenticated": True, "username": auth_username}
-                            },
-                            timeout=API_TIMEOUT
-                        )
-                        response.raise_for_status()
+                        apply_session_updates([{
+                            "user_id": st.session_state.user_id,
+                            "session_id": st.session_state.session_id,
+                            "state_updates": {"user_authenticated": True, "username": auth_username}
+                        }])
                         st.success("Login successful!")
                         auth_expander.expanded = False
-                        st.experimental_rerun()
+                        st.rerun()
                     except Exception as e:
                         st.error(f"Authentication failed: {str(e)}")
                 else:
@@ -294,17 +747,12 @@ with st.sidebar:
                 st.session_state.authenticated = False
                 # Update session state via API
                 try:
-                    response = requests.put(
-                        f"{API_BASE_URL}/api/sessions/{st.session_state.user_id}/{st.session_state.session_id}",
-                        json={
-                            "user_id": st.session_state.user_id,
-                            "session_id": st.session_state.session_id,
-                            "state_updates": {"user_authenticated": False}
-                        },
-                        timeout=API_TIMEOUT
-                    )
-                    response.raise_for_status()
-                    st.experimental_rerun()
+                    apply_session_updates([{
+                        "user_id": st.session_state.user_id,
+                        "session_id": st.session_state.session_id,
+                        "state_updates": {"user_authenticated": False}
+                    }])
+                    st.rerun()
                 except Exception as e:
                     st.error(f"Logout failed: {str(e)}")
     
@@ -315,7 +763,7 @@ with st.sidebar:
     
     # Refresh metrics button
     if st.button("Refresh Metrics"):
-        asyncio.run(fetch_metrics_async())
+        refresh_metrics()
         st.success("Metrics refreshed!")
     
     # Clear conversation button
@@ -324,7 +772,7 @@ with st.sidebar:
         st.success("Started a new conversation!")
     
     # Auto-refresh toggle
-    auto_refresh = st.checkbox("Auto-refresh metrics", value=True)
+    auto_refresh = st.checkbox("Auto-refresh metrics", value=True, key="auto_refresh")
     
     # About section
     st.markdown("### About")
@@ -335,183 +783,54 @@ with st.sidebar:
     """)
     
     # Footer
-    st.markdown("""
-    <div class="footer">
-        ADK Banking Bot v1.0<br>
-        © 2025 Your Bank
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_FOOTER_HTML, unsafe_allow_html=True)
 
 # Main content
 st.markdown('<h1 class="main-header">Banking Assistant</h1>', unsafe_allow_html=True)
 st.markdown('<p class="sub-header">Your AI-powered financial assistant</p>', unsafe_allow_html=True)
 
-# Tabs for different sections
-tabs = st.tabs(["💬 Chat", "📊 Analytics", "📝 Session State", "🔧 Tools"])
+@st.fragment
+def tool_usage_panel():
+    """Tool-usage bar chart in its own rerun scope.
 
-# Tab 1: Chat Interface
-with tabs[0]:
-    st.markdown("### Chat with Banking Assistant")
-    
-    # Display chat messages
-    chat_container = st.container()
-    with chat_container:
-        for message in st.session_state.messages:
-            if message["role"] == "user":
-                st.markdown(f'<div class="chat-message user-message">{message["content"]}</div>', unsafe_allow_html=True)
-            else:
-                st.markdown(f'<div class="chat-message assistant-message">{message["content"]}</div>', unsafe_allow_html=True)
-    
-    # Input field for user message
-    user_input = st.text_input("Type your message...", key="user_input")
-    
-    if user_input:
-        # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": user_input})
-        
-        # Send the message to the Banking Bot API
-        try:
-            response = requests.post(
-                f"{API_BASE_URL}/api/chat",
-                json={
-                    "message": user_input,
-                    "user_id": st.session_state.user_id,
-                    "session_id": st.session_state.session_id
-                },
-                timeout=API_TIMEOUT
-            )
-            
-            if response.status_code == 200:
-                response_data = response.json()
-                assistant_response = response_data.get("response_text", "I'm sorry, I couldn't process your request.")
-                
-                # Add assistant response to chat history
-                st.session_state.messages.append({"role": "assistant", "content": assistant_response})
-                
-                # Update local metrics
-                update_metrics_from_response(response_data)
-                
-                # Refresh metrics
-                asyncio.run(fetch_metrics_async())
-            else:
-                st.error(f"Error: API returned status code {response.status_code}")
-                logger.error(f"API error: {response.status_code} - {response.text}")
-        except Exception as e:
-            st.error(f"Failed to communicate with the Banking API: {str(e)}")
-            logger.error(f"API communication error: {str(e)}")
-            st.session_state.error = str(e)
-        
-        # Clear input field
-        st.session_state.user_input = ""
-        
-        # Rerun to update the UI
-        st.experimental_rerun()
-
-# Tab 2: Analytics
-with tabs[1]:
-    st.markdown("### Banking Bot Analytics")
-    
-    # Metrics overview
-    st.subheader("System Metrics")
-    
-    # Refresh metrics if needed
-    if auto_refresh and time.time() - st.session_state.last_refresh > REFRESH_INTERVAL:
-        asyncio.run(fetch_metrics_async())
-    
-    # Display metrics cards
-    metrics_cols = st.columns(4)
-    
-    # Extract metrics from state
-    metrics_data = st.session_state.metrics_data.get("config", {})
-    current_metrics = st.session_state.metrics_data.get("status", "unknown")
-    timestamp = st.session_state.metrics_data.get("timestamp", datetime.now().isoformat())
-    
-    with metrics_cols[0]:
-        st.markdown(
-            """
-            <div class="metrics-card">
-                <div class="metric-label">System Status</div>
-                <div class="metric-value">""" + current_metrics + """</div>
-            </div>
-            """, 
-            unsafe_allow_html=True
-        )
-    
-    with metrics_cols[1]:
-        st.markdown(
-            """
-            <div class="metrics-card">
-                <div class="metric-label">Total Requests</div>
-                <div class="metric-value">""" + str(len(st.session_state.messages) // 2) + """</div>
-            </div>
-            """, 
-            unsafe_allow_html=True
-        )
-    
-    with metrics_cols[2]:
-        st.markdown(
-            """
-            <div class="metrics-card">
-                <div class="metric-label">Last Updated</div>
-                <div class="metric-value">""" + datetime.fromisoformat(timestamp).strftime("%H:%M:%S") + """</div>
-            </div>
-            """, 
-            unsafe_allow_html=True
-        )
-    
-    with metrics_cols[3]:
-        st.markdown(
-            """
-            <div class="metrics-card">
-                <div class="metric-label">Session Type</div>
-                <div class="metric-value">""" + metrics_data.get("session_type", "unknown") + """</div>
-            </div>
-            """, 
-            unsafe_allow_html=True
-        )
-    
-    # Tool usage charts
-    st.subheader("Tool Usage")
-    
-    if st.session_state.tool_calls:
-        # Convert tool calls to dataframe
-        tool_df = pd.DataFrame({
-            "tool": list(st.session_state.tool_calls.keys()),
-            "count": list(st.session_state.tool_calls.values())
-        })
-        
-        # Create and display bar chart
+    Chat-tab interactions no longer re-execute this panel; it repaints
+    only when the fragment itself reruns.
+    """
+    items = st.session_state.tool_calls.most_common()
+    if items:
+        labels, counts = zip(*items)
         tool_fig = create_bar_chart(
             data=None,
-            labels=list(st.session_state.tool_calls.keys()),
-            values=list(st.session_state.tool_calls.values()),
+            labels=labels,
+            values=counts,
             title="Tool Usage Count",
             color="#90CAF9"
         )
         st.plotly_chart(tool_fig, use_container_width=True)
     else:
         st.info("No tool usage data available. Try interacting with the chat!")
-    
-    # Mock historical data visualizations
-    st.subheader("Historical Performance")
-    
+
+@st.fragment(run_every=REFRESH_INTERVAL)
+def historical_charts():
+    """Historical line charts repainting on the refresh timer."""
     # Create mock data if no real data available
     if not st.session_state.historical_metrics:
-        # Mock data for demo purposes
+        # Mock data for demo purposes; one vectorized draw instead of three
+        # random.random() calls per day.
         dates = [(datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7, 0, -1)]
-        mock_data = []
-        for date in dates:
-            mock_data.append({
+        r = np.random.default_rng().random((len(dates), 3))
+        st.session_state.historical_metrics = [
+            {
                 "date": date,
-                "requests": int(50 + 20 * (0.5 - (random.random() if 'random' in globals() else 0.5))),
-                "success_rate": 0.92 + 0.08 * (0.5 - (random.random() if 'random' in globals() else 0.5)),
-                "avg_latency": 150 + 50 * (0.5 - (random.random() if 'random' in globals() else 0.5))
-            })
-        st.session_state.historical_metrics = mock_data
-    
-    # Create visualizations
+                "requests": int(50 + 20 * (0.5 - r[i, 0])),
+                "success_rate": float(0.92 + 0.08 * (0.5 - r[i, 1])),
+                "avg_latency": float(150 + 50 * (0.5 - r[i, 2]))
+            }
+            for i, date in enumerate(dates)
+        ]
+
     hist_cols = st.columns(2)
-    
+
     with hist_cols[0]:
         # Request volume chart
         requests_fig = create_line_chart(
@@ -523,7 +842,7 @@ with tabs[1]:
         )
         if requests_fig:
             st.plotly_chart(requests_fig, use_container_width=True)
-    
+
     with hist_cols[1]:
         # Latency chart
         latency_fig = create_line_chart(
@@ -535,7 +854,7 @@ with tabs[1]:
         )
         if latency_fig:
             st.plotly_chart(latency_fig, use_container_width=True)
-    
+
     # Success rate chart
     success_fig = create_line_chart(
         data=st.session_state.historical_metrics,
@@ -547,6 +866,86 @@ with tabs[1]:
     if success_fig:
         st.plotly_chart(success_fig, use_container_width=True)
 
+# Tabs for different sections
+tabs = st.tabs(["💬 Chat", "📊 Analytics", "📝 Session State", "🔧 Tools"])
+
+# Tool-call aggregates, materialized once per rerun and shared by the
+# Analytics and Tools tabs instead of four separate dict->list conversions.
+_tool_items = tuple(st.session_state.tool_calls.items())
+tool_labels, tool_counts = zip(*_tool_items) if _tool_items else ((), ())
+
+# Tab 1: Chat Interface
+with tabs[0]:
+    st.markdown("### Chat with Banking Assistant")
+    
+    # Display chat messages
+    chat_container = st.container()
+    with chat_container:
+        for role, content in zip(st.session_state.msg_roles, st.session_state.msg_contents):
+            css_class = "user-message" if role == "user" else "assistant-message"
+            st.markdown(f'<div class="chat-message {css_class}">{content}</div>', unsafe_allow_html=True)
+    
+    # Input form: the script only reruns on submit, not on every widget
+    # change, so typing doesn't re-render the chart tabs.
+    with st.form("chat_form", clear_on_submit=True):
+        user_input = st.text_input("Type your message...", key="user_input")
+        submitted = st.form_submit_button("Send")
+
+    if submitted and user_input:
+        # Add user message to chat history
+        st.session_state.msg_roles.append("user")
+        st.session_state.msg_contents.append(user_input)
+        
+        # Prefer the SSE endpoint so tokens paint as they arrive; fall back
+        # to the buffered POST (which also carries tool-call metadata) if
+        # streaming is unavailable.
+        try:
+            try:
+                assistant_response = st.write_stream(stream_chat(user_input))
+                st.session_state.msg_roles.append("assistant")
+                st.session_state.msg_contents.append(assistant_response)
+                refresh_metrics()
+            except Exception as stream_error:
+                logger.warning(f"Streaming unavailable, using buffered chat: {stream_error}")
+                status_code, response_data = send_chat(user_input)
+
+                if status_code == 200 and response_data is not None:
+                    assistant_response = response_data.get("response_text", "I'm sorry, I couldn't process your request.")
+
+                    # Add assistant response to chat history
+                    st.session_state.msg_roles.append("assistant")
+                    st.session_state.msg_contents.append(assistant_response)
+
+                    # Update local metrics
+                    update_metrics_from_response(response_data)
+                else:
+                    st.error(f"Error: API returned status code {status_code}")
+                    logger.error(f"API error: {status_code}")
+        except Exception as e:
+            st.error(f"Failed to communicate with the Banking API: {str(e)}")
+            logger.error(f"API communication error: {str(e)}")
+            st.session_state.error = str(e)
+
+        # Rerun to update the UI (the form cleared itself on submit)
+        st.rerun()
+
+# Tab 2: Analytics
+with tabs[1]:
+    st.markdown("### Banking Bot Analytics")
+    
+    # Metrics overview
+    st.subheader("System Metrics")
+
+    metrics_panel()
+
+    # Tool usage charts
+    st.subheader("Tool Usage")
+    tool_usage_panel()
+
+    # Mock historical data visualizations
+    st.subheader("Historical Performance")
+    historical_charts()
+
 # Tab 3: Session State
 with tabs[2]:
     st.markdown("### Current Session State")
@@ -560,9 +959,7 @@ with tabs[2]:
         
         # Allow downloading session state as JSON
         json_str = json.dumps(session_state, indent=2)
-        b64 = base64.b64encode(json_str.encode()).decode()
-        href = f'<a href="data:application/json;base64,{b64}" download="session_state.json">Download Session State as JSON</a>'
-        st.markdown(href, unsafe_allow_html=True)
+        st.markdown(_download_href(json_str), unsafe_allow_html=True)
     else:
         st.warning("No session state available or failed to fetch from API.")
 
@@ -571,48 +968,26 @@ with tabs[3]:
     st.markdown("### Available Banking Tools")
     
     # Display available tools information
-    tools_data = [
-        {
-            "name": "Get Account Balance",
-            "description": "Fetches the current balance for a specified account.",
-            "usage": "Ask about your balance in checking, savings, or other accounts.",
-            "example": "What's my checking account balance?"
-        },
-        {
-            "name": "Transfer Money",
-            "description": "Transfers funds between accounts.",
-            "usage": "Specify source account, destination account, and amount.",
-            "example": "Transfer $100 from my checking to my savings account."
-        },
-        {
-            "name": "Financial Advisor",
-            "description": "Provides financial advice on various topics.",
-            "usage": "Ask for advice on savings, investments, or retirement planning.",
-            "example": "What's a good investment strategy for a moderate risk profile?"
-        }
-    ]
-    
-    for tool in tools_data:
-        with st.expander(f"{tool['name']}"):
-            st.markdown(f"**Description:** {tool['description']}")
-            st.markdown(f"**Usage:** {tool['usage']}")
-            st.markdown(f"**Example:** *{tool['example']}*")
+    for name, body in _TOOL_DESCRIPTIONS:
+        with st.expander(name):
+            st.markdown(body)
     
     # Tool execution history
     st.subheader("Recent Tool Executions")
     
-    if st.session_state.tool_calls:
-        tool_history = []
-        for tool, count in st.session_state.tool_calls.items():
-            for i in range(count):
-                # This would normally be real data from the API
-                tool_history.append({
-                    "tool": tool,
-                    "timestamp": (datetime.now() - timedelta(minutes=i*5)).strftime("%H:%M:%S"),
-                    "status": "Success" if random.random() > 0.1 else "Error" if 'random' in globals() else "Success"
-                })
-        
-        tool_history_df = pd.DataFrame(tool_history)
+    if tool_labels:
+        # This would normally be real data from the API; build the mock
+        # frame with vectorized numpy/pandas ops instead of a per-row loop.
+        tools = np.repeat(tool_labels, tool_counts)
+        offsets = np.arange(len(tools)) * 5
+        timestamps = (pd.Timestamp.now() - pd.to_timedelta(offsets, unit='m')).strftime("%H:%M:%S")
+        status = np.where(np.random.default_rng().random(len(tools)) > 0.1, "Success", "Error")
+
+        tool_history_df = pd.DataFrame({
+            "tool": tools,
+            "timestamp": timestamps,
+            "status": status
+        })
         st.dataframe(tool_history_df, use_container_width=True)
     else:
         st.info("No tool execution history available yet. Try interacting with the chat!")
@@ -622,11 +997,4 @@ if st.session_state.error:
     st.error(f"Error: {st.session_state.error}")
     if st.button("Clear Error"):
         st.session_state.error = None
-        st.experimental_rerun()
-
-# Automatic refresh
-if auto_refresh and time.time() - st.session_state.last_refresh > REFRESH_INTERVAL:
-    # Use threading to avoid blocking the UI
-    refresh_thread = threading.Thread(target=lambda: asyncio.run(fetch_metrics_async()))
-    refresh_thread.daemon = True
-    refresh_thread.start()
+        st.rerun()
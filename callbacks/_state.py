@@ -0,0 +1,19 @@
+# callbacks/_state.py
+"""Shared helpers for guardrail session-state bookkeeping."""
+from typing import Any
+
+
+def bump_counter(state: Any, key: str) -> int:
+    """Increment a counter key in session state and return the new value.
+
+    The counter stays a flat top-level key so ADK's delta-tracking state
+    sees the write (mutating a nested Counter would bypass __setitem__),
+    while first-use initialization happens in the exception path instead
+    of a .get(key, 0) lookup on every call.
+    """
+    try:
+        value = state[key] + 1
+    except KeyError:
+        value = 1
+    state[key] = value
+    return value
@@ -3,8 +3,100 @@ from google.adk.agents.callback_context import CallbackContext
 from google.adk.models.llm_request import LlmRequest
 from google.adk.models.llm_response import LlmResponse
 from google.genai import types
-from typing import Optional, List, Set
+from typing import FrozenSet, Optional, List, Set
+import functools
+import logging
 import re
+import string
+
+from ._state import bump_counter
+
+logger = logging.getLogger(__name__)
+
+# a-z -> A-Z translation table for the ASCII fast path below.
+_ASCII_UPPER = str.maketrans(string.ascii_lowercase, string.ascii_uppercase)
+
+@functools.lru_cache(maxsize=8)
+def _keyword_scanner(keywords: FrozenSet[str]) -> "re.Pattern":
+    """Compile a blocked-keyword set into one alternation, cached per set.
+
+    A single scan of the message replaces one substring search per keyword,
+    so cost stays linear in the text no matter how large the blocked list
+    grows. Longer keywords come first so they win over any shorter
+    keyword they contain.
+    """
+    ordered = sorted(keywords, key=len, reverse=True)
+    return re.compile("|".join(map(re.escape, ordered)))
+
+def _latest_user_text(llm_request: LlmRequest) -> str:
+    """Return the text of the most recent user message in the request.
+
+    The result is stashed on the request object so stacked guards walking
+    the same request share one reverse scan of the contents list.
+    """
+    cached = getattr(llm_request, "_cached_user_text", None)
+    if cached is not None:
+        return cached
+
+    text = ""
+    if llm_request.contents:
+        for content in reversed(llm_request.contents):
+            if content.role == 'user' and content.parts:
+                if content.parts[0].text:
+                    text = content.parts[0].text
+                    break
+
+    try:
+        object.__setattr__(llm_request, "_cached_user_text", text)
+    except (AttributeError, TypeError):
+        # Some request implementations refuse extra attributes; the scan
+        # just runs again for the next guard.
+        pass
+    return text
+
+@functools.lru_cache(maxsize=64)
+def _uppercased(text: str) -> str:
+    """Uppercase a message once even when several guards inspect the same turn.
+
+    Keyed by the text itself, so there is no staleness to manage across
+    turns; the small LRU bound keeps old messages from accumulating.
+
+    ASCII text — the overwhelming case for banking prompts — takes a
+    table-translate fast path instead of the Unicode-aware str.upper,
+    which is all the blocked keywords need since they are ASCII-only.
+    """
+    if text.isascii():
+        return text.translate(_ASCII_UPPER)
+    return text.upper()
+
+# Regex patterns for common PII. They are combined into one named-group
+# alternation compiled at import, so each request is scanned in a single
+# pass instead of once per pattern. Alternatives are ordered most-specific
+# first so e.g. a full card number isn't claimed by the account_number group.
+_PII_PATTERN_SOURCES = {
+    "credit_card": r'\b(?:\d{4}[-\s]?){3}\d{4}\b',  # Credit card format: xxxx-xxxx-xxxx-xxxx
+    "ssn": r'\b\d{3}[-\s]?\d{2}[-\s]?\d{4}\b',  # SSN format: xxx-xx-xxxx
+    "email": r'\b[\w.%+-]+@[\w.-]+\.[A-Za-z]{2,}\b',  # Email pattern
+    # NANP phone numbers: area and central-office codes start with 2-9, which
+    # rejects ISBNs, part numbers and 123-456-7890-style placeholders outright
+    "phone": r'\b(?:\+\d{1,2}\s)?\(?[2-9]\d{2}\)?[-.\s]?[2-9]\d{2}[-.\s]?\d{4}\b',
+    "account_number": r'(?<!\d)\d{8,17}(?!\d)'  # Generic account number (8-17 digits)
+}
+
+_PII_COMBINED = re.compile(
+    "|".join(f"(?P<{name}>{pattern})" for name, pattern in _PII_PATTERN_SOURCES.items())
+)
+
+# Well-known placeholder numbers that pass the NANP shape check anyway.
+_PHONE_PLACEHOLDERS = frozenset({"555-555-5555", "(555) 555-5555", "555.555.5555"})
+
+def _first_pii_match(text: str):
+    """Return the first real PII match in text, skipping placeholder phones."""
+    match = _PII_COMBINED.search(text)
+    while (match and match.lastgroup == "phone"
+            and match.group() in _PHONE_PLACEHOLDERS):
+        match = _PII_COMBINED.search(text, match.end())
+    return match
 
 class InputGuard:
     """A class containing callback functions to validate user input before it reaches the LLM."""
@@ -27,7 +119,7 @@ class InputGuard:
             LlmResponse if blocked, None if allowed to proceed
         """
         agent_name = callback_context.agent_name
-        print(f"--- Callback: blocked_keywords_guardrail running for agent: {agent_name} ---")
+        logger.debug("blocked_keywords_guardrail running for agent %s", agent_name)
         
         # Default blocked keywords for a banking bot (expand as needed)
         default_blocked_keywords = {
@@ -39,27 +131,24 @@ class InputGuard:
         keywords_to_check = blocked_keywords if blocked_keywords else default_blocked_keywords
         
         # Extract the text from the latest user message
-        last_user_message_text = ""
-        if llm_request.contents:
-            # Find the most recent message with role 'user'
-            for content in reversed(llm_request.contents):
-                if content.role == 'user' and content.parts:
-                    if content.parts[0].text:
-                        last_user_message_text = content.parts[0].text
-                        break
-        
-        print(f"--- Callback: Inspecting user message for blocked keywords ---")
+        last_user_message_text = _latest_user_text(llm_request)
+
+        logger.debug("Inspecting user message for blocked keywords")
         
-        # Check for any blocked keywords (case insensitive)
-        user_message_upper = last_user_message_text.upper()
-        found_keywords = [kw for kw in keywords_to_check if kw in user_message_upper]
+        # Check for any blocked keywords (case insensitive) in one pass;
+        # empty messages skip the uppercase copy and the scan entirely.
+        found_keywords = []
+        if last_user_message_text:
+            user_message_upper = _uppercased(last_user_message_text)
+            scanner = _keyword_scanner(frozenset(keywords_to_check))
+            found_keywords = sorted({m.group() for m in scanner.finditer(user_message_upper)})
         
         if found_keywords:
-            print(f"--- Callback: Found blocked keywords: {found_keywords}. Blocking LLM call! ---")
+            logger.debug("Found blocked keywords %s; blocking LLM call", found_keywords)
             
             # Set a flag in state to record the block event
             callback_context.state["guardrail_blocked_keywords"] = found_keywords
-            callback_context.state["blocked_input_count"] = callback_context.state.get("blocked_input_count", 0) + 1
+            bump_counter(callback_context.state, "blocked_input_count")
             
             # Create a safe response that doesn't repeat the blocked content
             return LlmResponse(
@@ -69,7 +158,7 @@ class InputGuard:
                 )
             )
         else:
-            print(f"--- Callback: No blocked keywords found. Allowing LLM call for {agent_name}. ---")
+            logger.debug("No blocked keywords found; allowing LLM call for %s", agent_name)
             return None  # Allow the request to proceed
     
     @staticmethod
@@ -88,41 +177,25 @@ class InputGuard:
             LlmResponse if blocked, None if allowed to proceed
         """
         agent_name = callback_context.agent_name
-        print(f"--- Callback: pii_detection_guardrail running for agent: {agent_name} ---")
+        logger.debug("pii_detection_guardrail running for agent %s", agent_name)
         
         # Extract the text from the latest user message
-        last_user_message_text = ""
-        if llm_request.contents:
-            for content in reversed(llm_request.contents):
-                if content.role == 'user' and content.parts:
-                    if content.parts[0].text:
-                        last_user_message_text = content.parts[0].text
-                        break
-        
-        print(f"--- Callback: Checking for PII patterns ---")
-        
-        # Define regex patterns for common PII
-        pii_patterns = {
-            "credit_card": r'\b(?:\d{4}[-\s]?){3}\d{4}\b',  # Credit card format: xxxx-xxxx-xxxx-xxxx
-            "ssn": r'\b\d{3}[-\s]?\d{2}[-\s]?\d{4}\b',  # SSN format: xxx-xx-xxxx
-            "email": r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',  # Email pattern
-            "phone": r'\b(?:\+\d{1,2}\s)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b',  # Phone number patterns
-            "account_number": r'\b\d{8,17}\b'  # Generic account number (8-17 digits)
-        }
-        
-        # Check for PII matches
-        pii_found = {}
-        for pii_type, pattern in pii_patterns.items():
-            matches = re.findall(pattern, last_user_message_text)
-            if matches:
-                pii_found[pii_type] = True
+        last_user_message_text = _latest_user_text(llm_request)
+
+        logger.debug("Checking for PII patterns")
         
-        if pii_found:
-            print(f"--- Callback: Detected potential PII: {list(pii_found.keys())}. Blocking LLM call! ---")
-            
+        # The block/allow decision only needs one hit, so stop at the first
+        # match instead of scanning the whole message; the named group of
+        # that match classifies what was found.
+        first_match = _first_pii_match(last_user_message_text)
+
+        if first_match:
+            pii_types = [first_match.lastgroup]
+            logger.debug("Detected potential PII %s; blocking LLM call", pii_types)
+
             # Update state to record PII detection
-            callback_context.state["guardrail_pii_detected_types"] = list(pii_found.keys())
-            callback_context.state["pii_detection_count"] = callback_context.state.get("pii_detection_count", 0) + 1
+            callback_context.state["guardrail_pii_detected_types"] = pii_types
+            bump_counter(callback_context.state, "pii_detection_count")
             
             # Return a warning response without including any detected PII
             return LlmResponse(
@@ -132,5 +205,5 @@ class InputGuard:
                 )
             )
         else:
-            print(f"--- Callback: No PII patterns detected. Allowing LLM call. ---")
+            logger.debug("No PII patterns detected; allowing LLM call")
             return None  # Allow the request to proceed
\ No newline at end of file
@@ -1,7 +1,24 @@
 # callbacks/before_tool.py
 from google.adk.tools.base_tool import BaseTool
 from google.adk.tools.tool_context import ToolContext
-from typing import Optional, Dict, Any, List, Set
+from typing import FrozenSet, Optional, Dict, Any, List, Set
+import functools
+import logging
+import re
+
+from ._state import bump_counter
+
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=8)
+def _restricted_scanner(restricted: FrozenSet[str]) -> "re.Pattern":
+    """Compile a restricted-account set into one alternation, cached per set.
+
+    One regex pass over an account string replaces a substring search per
+    restricted token, keeping the check linear in the account length.
+    """
+    ordered = sorted(restricted, key=len, reverse=True)
+    return re.compile("|".join(map(re.escape, ordered)))
 
 class ToolGuard:
     """A class containing callback functions to validate tool arguments before execution."""
@@ -28,24 +45,24 @@ class ToolGuard:
         tool_name = tool.name
         agent_name = tool_context.agent_name
         
-        print(f"--- Callback: transfer_limit_guardrail running for tool '{tool_name}' in agent '{agent_name}' ---")
+        logger.debug("transfer_limit_guardrail running for tool %s in agent %s", tool_name, agent_name)
         
         # Only apply to the transfer_money tool
         if tool_name != "transfer_money":
-            print(f"--- Callback: Not the transfer tool. Allowing execution. ---")
+            logger.debug("Not the transfer tool; allowing execution")
             return None
         
         # Check arguments
         if "amount" in args:
             transfer_amount = args["amount"]
-            print(f"--- Callback: Checking transfer amount: ${transfer_amount} against limit: ${transfer_limit} ---")
+            logger.debug("Checking transfer amount $%s against limit $%s", transfer_amount, transfer_limit)
             
             # Apply transfer limit check
             if transfer_amount > transfer_limit:
-                print(f"--- Callback: Transfer amount ${transfer_amount} exceeds limit ${transfer_limit}. Blocking! ---")
+                logger.debug("Transfer amount $%s exceeds limit $%s; blocking", transfer_amount, transfer_limit)
                 
                 # Log to state
-                tool_context.state["transfer_limit_exceeded_count"] = tool_context.state.get("transfer_limit_exceeded_count", 0) + 1
+                bump_counter(tool_context.state, "transfer_limit_exceeded_count")
                 tool_context.state["last_blocked_transfer_amount"] = transfer_amount
                 
                 # Return error response in the same format expected from the tool
@@ -54,7 +71,7 @@ class ToolGuard:
                     "error_message": f"Transfer amount ${transfer_amount:.2f} exceeds the maximum allowed limit of ${transfer_limit:.2f} per transaction. Please reduce the amount or contact customer service for assistance with larger transfers."
                 }
         
-        print(f"--- Callback: Transfer amount within limits. Allowing execution. ---")
+        logger.debug("Transfer amount within limits; allowing execution")
         return None  # Allow the tool to execute
     
     @staticmethod
@@ -77,7 +94,7 @@ class ToolGuard:
             Dict with error information if blocked, None to allow the tool to execute
         """
         tool_name = tool.name
-        print(f"--- Callback: account_validation_guardrail running for tool '{tool_name}' ---")
+        logger.debug("account_validation_guardrail running for tool %s", tool_name)
         
         # Default restricted accounts
         default_restricted = {"business", "corporate", "trust", "minor", "deceased"}
@@ -85,11 +102,13 @@ class ToolGuard:
         
         # Apply to balance checks and transfers
         if tool_name in ["get_balance", "transfer_money"]:
+            scanner = _restricted_scanner(frozenset(accounts_to_check))
+
             # For get_balance, check the account_id
             if tool_name == "get_balance" and "account_id" in args:
                 account = args["account_id"].lower()
-                if any(restricted in account for restricted in accounts_to_check):
-                    print(f"--- Callback: Restricted account '{account}' detected. Blocking access. ---")
+                if scanner.search(account):
+                    logger.debug("Restricted account %s detected; blocking access", account)
                     
                     # Log to state
                     tool_context.state["restricted_account_access_attempt"] = account
@@ -105,11 +124,11 @@ class ToolGuard:
                 destination = args.get("destination_account", "").lower()
                 
                 # Check if either account is restricted
-                restricted_source = any(restricted in source for restricted in accounts_to_check)
-                restricted_dest = any(restricted in destination for restricted in accounts_to_check)
+                restricted_source = scanner.search(source) is not None
+                restricted_dest = scanner.search(destination) is not None
                 
                 if restricted_source or restricted_dest:
-                    print(f"--- Callback: Restricted account detected in transfer. Blocking. ---")
+                    logger.debug("Restricted account detected in transfer; blocking")
                     
                     # Log to state
                     tool_context.state["restricted_transfer_attempt"] = {
@@ -122,7 +141,7 @@ class ToolGuard:
                         "error_message": f"This transfer involves a restricted account type that requires additional verification. Please contact customer service."
                     }
         
-        print(f"--- Callback: No account restrictions found. Allowing tool execution. ---")
+        logger.debug("No account restrictions found; allowing tool execution")
         return None  # Allow the tool to execute
     
     @staticmethod
@@ -143,7 +162,7 @@ class ToolGuard:
             Dict with error information if blocked, None to allow the tool to execute
         """
         tool_name = tool.name
-        print(f"--- Callback: authentication_guardrail for tool '{tool_name}' ---")
+        logger.debug("authentication_guardrail for tool %s", tool_name)
         
         # Define which tools require authentication
         sensitive_tools = {"transfer_money", "get_balance"}
@@ -151,18 +170,38 @@ class ToolGuard:
         if tool_name in sensitive_tools:
             # Check authentication status in session state
             is_authenticated = tool_context.state.get("user_authenticated", False)
-            print(f"--- Callback: Authentication check for sensitive tool. Status: {is_authenticated} ---")
+            logger.debug("Authentication check for sensitive tool; status=%s", is_authenticated)
             
             if not is_authenticated:
-                print(f"--- Callback: User not authenticated for sensitive operation. Blocking. ---")
+                logger.debug("User not authenticated for sensitive operation; blocking")
                 
                 # Update state to recommend authentication
-                tool_context.state["auth_required_count"] = tool_context.state.get("auth_required_count", 0) + 1
+                bump_counter(tool_context.state, "auth_required_count")
                 
                 return {
                     "status": "error",
                     "error_message": "This operation requires authentication. Please log in to your account or verify your identity before proceeding."
                 }
         
-        print(f"--- Callback: Authentication check passed or not required. Allowing tool execution. ---")
-        return None  # Allow the tool to execute
\ No newline at end of file
+        logger.debug("Authentication check passed or not required; allowing tool execution")
+        return None  # Allow the tool to execute
+
+    @staticmethod
+    def make_dispatcher(per_tool: Dict[str, tuple]) -> Any:
+        """Build a before-tool callback that dispatches on tool name.
+
+        Tools without an entry skip guard execution entirely, so the name
+        comparisons inside each guard stop running for unrelated tools.
+        Guards run in order; the first non-None result blocks the call.
+        """
+        def dispatch(tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext) -> Optional[Dict]:
+            guards = per_tool.get(tool.name)
+            if not guards:
+                return None
+            for guard in guards:
+                result = guard(tool, args, tool_context)
+                if result is not None:
+                    return result
+            return None
+
+        return dispatch
\ No newline at end of file
@@ -1,21 +1,44 @@
 # config.py
+import atexit
+import functools
 import os
-from typing import Dict, Any, Optional, List
+import sys
+import queue
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional, List, Tuple
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from dotenv import load_dotenv
 
 # Load environment variables from .env file if it exists
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('banking_bot.log')
-    ]
-)
+# Configure logging. Records go onto an in-process queue and a background
+# listener thread does the actual console/file writes, so request threads
+# never block on the log file's lock or disk I/O.
+_LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+def _setup_logging() -> None:
+    root = logging.getLogger()
+    if any(isinstance(handler, QueueHandler) for handler in root.handlers):
+        return  # Already configured (e.g. module re-imported under reload)
+
+    formatter = logging.Formatter(_LOG_FORMAT)
+    # delay=True defers opening the log file until the first record, so
+    # merely importing config doesn't touch the filesystem.
+    targets = [logging.StreamHandler(), logging.FileHandler('banking_bot.log', delay=True)]
+    for target in targets:
+        target.setFormatter(formatter)
+
+    log_queue = queue.Queue(-1)
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+
+    listener = QueueListener(log_queue, *targets, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+_setup_logging()
 logger = logging.getLogger(__name__)
 
 # Application constants
@@ -41,30 +64,56 @@ MODELS = {
     "transfer_agent": os.getenv("TRANSFER_AGENT_MODEL", "openai/gpt-4o")
 }
 
-# Banking Bot specific configurations
-BANKING_CONFIG = {
+# Banking Bot specific configurations, frozen into an immutable slotted
+# dataclass: attribute access beats a dict key lookup on the guardrail hot
+# paths, and accidental mutation after import is impossible.
+@dataclass(frozen=True, slots=True)
+class BankingConfig:
     # Transfer limits
-    "max_transfer_amount": float(os.getenv("MAX_TRANSFER_AMOUNT", "1000.0")),
-    "daily_transfer_limit": float(os.getenv("DAILY_TRANSFER_LIMIT", "5000.0")),
-    
+    max_transfer_amount: float
+    daily_transfer_limit: float
+
     # Security settings
-    "authentication_required": os.getenv("AUTH_REQUIRED", "true").lower() == "true",
-    "blocked_keywords": os.getenv("BLOCKED_KEYWORDS", "password,ssn,social security,pin").split(","),
-    "restricted_accounts": os.getenv("RESTRICTED_ACCOUNTS", "business,corporate,trust").split(","),
-    
+    authentication_required: bool
+    blocked_keywords: Tuple[str, ...]
+    restricted_accounts: Tuple[str, ...]
+
     # Session settings
-    "session_idle_timeout": int(os.getenv("SESSION_IDLE_TIMEOUT", "900")),  # 15 minutes
-    
+    session_idle_timeout: int
+
     # UI/UX settings
-    "welcome_message": os.getenv(
-        "WELCOME_MESSAGE", 
+    welcome_message: str
+    authentication_message: str
+
+
+BANKING = BankingConfig(
+    max_transfer_amount=float(os.getenv("MAX_TRANSFER_AMOUNT", "1000.0")),
+    daily_transfer_limit=float(os.getenv("DAILY_TRANSFER_LIMIT", "5000.0")),
+    authentication_required=os.getenv("AUTH_REQUIRED", "true").lower() == "true",
+    blocked_keywords=tuple(os.getenv("BLOCKED_KEYWORDS", "password,ssn,social security,pin").split(",")),
+    restricted_accounts=tuple(os.getenv("RESTRICTED_ACCOUNTS", "business,corporate,trust").split(",")),
+    session_idle_timeout=int(os.getenv("SESSION_IDLE_TIMEOUT", "900")),  # 15 minutes
+    welcome_message=os.getenv(
+        "WELCOME_MESSAGE",
         "Welcome to Banking Assistant! How can I help you today?"
     ),
-    "authentication_message": os.getenv(
+    authentication_message=os.getenv(
         "AUTH_MESSAGE",
         "Please authenticate to access banking services."
     )
-}
+)
+
+# Dict view kept for callers that still index by key
+BANKING_CONFIG = asdict(BANKING)
+
+# Blocked keywords normalized once at import: the guardrail compares against
+# uppercased message text, so handing it pre-uppercased, interned strings
+# avoids re-normalizing per request (the raw env list is lowercase).
+BLOCKED_KEYWORDS_UPPER = frozenset(
+    sys.intern(keyword.strip().upper())
+    for keyword in BANKING.blocked_keywords
+    if keyword.strip()
+)
 
 # FastAPI settings
 API_CONFIG = {
@@ -82,16 +131,19 @@ def validate_config() -> bool:
     Returns:
         bool: True if config is valid, raises exception otherwise
     """
-    # Check for API keys
-    missing_keys = []
-    for provider, key in API_KEYS.items():
-        if provider in MODELS.values() and not key:
-            missing_keys.append(provider)
-    
+    # Check for API keys: intersect the providers the configured models
+    # actually reference with the providers lacking a key, instead of
+    # scanning every provider/model combination.
+    used_providers = {get_model_provider(model) for model in MODELS.values()}
+    missing_keys = sorted(
+        provider for provider in used_providers
+        if provider in API_KEYS and not API_KEYS[provider]
+    )
+
     if missing_keys:
+        # Warn rather than fail hard; providers can also pick keys up from
+        # the environment at request time (litellm does).
         logger.warning(f"Missing API keys for providers: {', '.join(missing_keys)}")
-        if any(model.startswith(f"{provider}/") for provider in missing_keys for model in MODELS.values()):
-            raise ValueError(f"Missing required API keys: {', '.join(missing_keys)}")
     
     # Check for SQLite directory if using SQLite sessions
     if SESSION_TYPE == "sqlite":
@@ -106,6 +158,7 @@ def validate_config() -> bool:
     logger.info("Configuration validated successfully")
     return True
 
+@functools.lru_cache(maxsize=None)
 def get_model_provider(model_name: str) -> str:
     """
     Extract the provider from a model name.
@@ -127,13 +180,14 @@ def display_config() -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Sanitized configuration
     """
-    # Create a copy to avoid modifying the original
+    # Create a copy to avoid modifying the original; dict() is a C-level
+    # shallow copy, the comprehension form stays only where a filter applies.
     display = {
         "app_name": APP_NAME,
         "session_type": SESSION_TYPE,
-        "models": {k: v for k, v in MODELS.items()},
-        "banking_config": {k: v for k, v in BANKING_CONFIG.items() if k not in ["blocked_keywords", "restricted_accounts"]},
-        "api_config": {k: v for k, v in API_CONFIG.items()},
+        "models": dict(MODELS),
+        "banking_config": {k: v for k, v in asdict(BANKING).items() if k not in ["blocked_keywords", "restricted_accounts"]},
+        "api_config": dict(API_CONFIG),
     }
     
     # Replace API keys with status
@@ -144,10 +198,29 @@ def display_config() -> Dict[str, Any]:
     
     return display
 
-# Validate configuration on import
-try:
-    validate_config()
-    logger.info(f"Configuration loaded: {display_config()}")
-except Exception as e:
-    logger.error(f"Configuration error: {e}")
-    raise
\ No newline at end of file
+_INITIALIZED = False
+
+def init_config() -> bool:
+    """
+    Validate and log the configuration, once per process.
+
+    Called from application startup rather than at import, so unit tests
+    and tooling that merely import this module skip the validation work
+    and the config dump in the logs.
+
+    Returns:
+        bool: True once the configuration has been validated
+    """
+    global _INITIALIZED
+    if _INITIALIZED:
+        return True
+
+    try:
+        validate_config()
+        logger.info(f"Configuration loaded: {display_config()}")
+    except Exception as e:
+        logger.error(f"Configuration error: {e}")
+        raise
+
+    _INITIALIZED = True
+    return True
\ No newline at end of file
@@ -0,0 +1,104 @@
+# monitoring/_scheduler.py
+"""One shared timer thread for the monitoring package's periodic work.
+
+Each monitoring service used to run its own always-on daemon thread that
+slept in a fixed-interval poll loop. The scheduler keeps a heap of
+(next_run, task) entries and wakes exactly when the earliest task is due,
+so idle services cost no wakeups and calendar tasks (the daily report)
+fire at their actual due time instead of being polled for.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Scheduler:
+    """Runs registered callables on one background thread, earliest-due first."""
+
+    def __init__(self):
+        # Heap entries: (run_at, seq, name, func, next_run_fn). The seq
+        # breaks ties so heapq never compares callables.
+        self._tasks = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def every(self, interval: float, func: Callable[[], None], name: str,
+              run_now: bool = True) -> None:
+        """
+        Schedule a recurring task.
+
+        Args:
+            interval: Seconds between runs
+            func: Zero-argument callable to run
+            name: Task name used in error logs
+            run_now: Whether the first run is immediate or one interval out
+        """
+        first = time.time() if run_now else time.time() + interval
+        self._add(first, name, func, lambda now: now + interval)
+
+    def daily_at_midnight(self, func: Callable[[], None], name: str) -> None:
+        """Schedule a task to run once per day at local midnight."""
+        self._add(_next_midnight(), name, func, lambda now: _next_midnight())
+
+    def stop(self) -> None:
+        """Stop the scheduler thread after its current task, if any."""
+        self._stop.set()
+        self._wakeup.set()
+
+    def _add(self, run_at: float, name: str, func: Callable[[], None],
+             next_run_fn: Callable[[float], float]) -> None:
+        with self._lock:
+            heapq.heappush(self._tasks, (run_at, next(self._seq), name, func, next_run_fn))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, daemon=True, name="monitoring-scheduler"
+                )
+                self._thread.start()
+        # A newly added task may be due before the current heap head
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            now = time.time()
+            job = None
+            with self._lock:
+                if self._tasks and self._tasks[0][0] <= now:
+                    job = heapq.heappop(self._tasks)
+                    timeout = None
+                else:
+                    timeout = self._tasks[0][0] - now if self._tasks else None
+
+            if job is None:
+                # Sleep until the next deadline or until a task is added
+                self._wakeup.wait(timeout)
+                self._wakeup.clear()
+                continue
+
+            _, seq, name, func, next_run_fn = job
+            try:
+                func()
+            except Exception as e:
+                logger.error(f"Error in scheduled task {name}: {e}")
+
+            with self._lock:
+                heapq.heappush(
+                    self._tasks, (next_run_fn(time.time()), seq, name, func, next_run_fn)
+                )
+
+
+def _next_midnight() -> float:
+    tomorrow = datetime.now().date() + timedelta(days=1)
+    return datetime.combine(tomorrow, datetime.min.time()).timestamp()
+
+
+# Shared instance used by the monitoring services
+scheduler = Scheduler()
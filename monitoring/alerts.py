@@ -1,11 +1,13 @@
 # monitoring/alerts.py
+import atexit
+import itertools
 import logging
+import queue
 import threading
-import time
+from contextlib import contextmanager
 from typing import Dict, Any, List, Optional, Callable, Set
 from datetime import datetime, timedelta
 from enum import Enum
-import json
 import os
 import smtplib
 from email.mime.text import MIMEText
@@ -13,6 +15,8 @@ from email.mime.multipart import MIMEMultipart
 
 from .metrics_collector import metrics_collector
 from .performance_tracker import performance_tracker
+from ._scheduler import scheduler
+from ._serialization import dumps_json_compact, loads_json
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -24,6 +28,10 @@ class AlertSeverity(Enum):
     ERROR = "error"
     CRITICAL = "critical"
 
+# Severity rank by value, built once: filtering compares via O(1) dict
+# lookups instead of a list .index() scan per alert
+_SEVERITY_ORDER = {severity.value: index for index, severity in enumerate(AlertSeverity)}
+
 class AlertType(Enum):
     """Types of alerts that can be triggered."""
     PERFORMANCE = "performance"
@@ -33,6 +41,38 @@ class AlertType(Enum):
     SECURITY = "security"
     SYSTEM = "system"
 
+class _RWLock:
+    """Minimal readers-preferred read/write lock.
+
+    Multiple readers proceed concurrently; a writer waits for all readers
+    to drain and then holds exclusive access. Lets dashboard polls of the
+    alerts dict overlap instead of serializing behind alert writers.
+    """
+
+    def __init__(self):
+        self._readers = 0
+        self._readers_lock = threading.Lock()
+        self._writer_lock = threading.Lock()
+
+    @contextmanager
+    def read_locked(self):
+        with self._readers_lock:
+            self._readers += 1
+            if self._readers == 1:
+                self._writer_lock.acquire()
+        try:
+            yield
+        finally:
+            with self._readers_lock:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._writer_lock.release()
+
+    @contextmanager
+    def write_locked(self):
+        with self._writer_lock:
+            yield
+
 class AlertSystem:
     """System for detecting and handling alert conditions."""
     
@@ -72,17 +112,46 @@ class AlertSystem:
             }
         }
         
+        # Monotonic id sequence; next() is a single GIL-atomic op, unlike
+        # hashing the alert message, and ids can never collide
+        self._alert_seq = itertools.count()
+
         # Active alerts
         self.active_alerts: Dict[str, Dict[str, Any]] = {}
         self.resolved_alerts: List[Dict[str, Any]] = []
-        self.alert_lock = threading.RLock()
+        # Dedup keys of currently active alerts; checking membership here is
+        # O(1), whereas active_alerts is keyed by generated alert ids.
+        self._active_alert_keys: Set[str] = set()
+        # Read/write lock: get_active_alerts only reads, so concurrent polls
+        # share the lock and just the mutating paths take exclusive access.
+        # (No critical section re-enters — auto-resolve collects candidates
+        # under the lock and resolves after releasing it.)
+        self.alert_lock = _RWLock()
         
         # Create alerts directory
         os.makedirs(alerts_dir, exist_ok=True)
-        
-        # Start monitoring thread
-        self._monitor_thread = threading.Thread(target=self._background_monitor, daemon=True)
-        self._monitor_thread.start()
+
+        # Alerts persist as appended lines in one JSONL file per day instead
+        # of a file per alert, so weeks of alerts stay a handful of inodes
+        # and each save is a single buffered write. Active state survives
+        # restarts by replaying the recent logs.
+        self._log_fp = None
+        self._log_day: Optional[str] = None
+        self._replay_recent_logs()
+
+        # Alert persistence goes through a queue to a dedicated writer
+        # thread, so trigger/resolve callers never block on file I/O.
+        self._write_queue: "queue.Queue" = queue.Queue()
+        # Hash of the last payload written per alert id (writer thread only):
+        # re-saves of an unchanged alert skip the log append entirely
+        self._saved_hashes: Dict[str, int] = {}
+        self._writer_thread = threading.Thread(target=self._alert_writer, daemon=True)
+        self._writer_thread.start()
+        atexit.register(self.flush)
+
+        # Alert checks run on the monitoring package's shared scheduler
+        # thread rather than a dedicated sleep-poll loop
+        scheduler.every(60, self._run_alert_checks, name="alert_checks")
         
         # Register default handlers
         self._register_default_handlers()
@@ -115,23 +184,26 @@ class AlertSystem:
         self.thresholds[alert_type][key] = value
         logger.info(f"Set {alert_type.value} threshold: {key}={value}")
     
-    def trigger_alert(self, alert_type: AlertType, severity: AlertSeverity, 
-                     message: str, details: Optional[Dict[str, Any]] = None) -> str:
+    def trigger_alert(self, alert_type: AlertType, severity: AlertSeverity,
+                     message: str, details: Optional[Dict[str, Any]] = None,
+                     dedup_key: Optional[str] = None) -> Optional[str]:
         """
         Trigger a new alert.
-        
+
         Args:
             alert_type: Type of the alert
             severity: Severity level
             message: Alert message
             details: Additional alert details
-            
+            dedup_key: Optional key identifying the alert condition; while an
+                alert with this key is active, repeat triggers are dropped
+
         Returns:
-            str: Alert ID
+            Optional[str]: Alert ID, or None if suppressed as a duplicate
         """
         now = datetime.now()
-        alert_id = f"{alert_type.value}_{now.strftime('%Y%m%d%H%M%S')}_{hash(message) % 10000}"
-        
+        alert_id = f"{alert_type.value}_{now.strftime('%Y%m%d%H%M%S')}_{next(self._alert_seq):08x}"
+
         alert = {
             "id": alert_id,
             "type": alert_type.value,
@@ -143,8 +215,13 @@ class AlertSystem:
             "resolved_at": None,
             "resolution_message": None
         }
-        
-        with self.alert_lock:
+
+        with self.alert_lock.write_locked():
+            if dedup_key:
+                if dedup_key in self._active_alert_keys:
+                    return None
+                self._active_alert_keys.add(dedup_key)
+                alert["details"]["_dedup_key"] = dedup_key
             self.active_alerts[alert_id] = alert
         
         # Write alert to file
@@ -171,11 +248,12 @@ class AlertSystem:
         Returns:
             bool: True if alert was found and resolved, False otherwise
         """
-        with self.alert_lock:
+        with self.alert_lock.write_locked():
             if alert_id not in self.active_alerts:
                 return False
             
             alert = self.active_alerts.pop(alert_id)
+            self._active_alert_keys.discard(alert["details"].get("_dedup_key"))
             alert["status"] = "resolved"
             alert["resolved_at"] = datetime.now().isoformat()
             alert["resolution_message"] = resolution_message
@@ -204,7 +282,7 @@ class AlertSystem:
         Returns:
             List[Dict[str, Any]]: Matching active alerts
         """
-        with self.alert_lock:
+        with self.alert_lock.read_locked():
             alerts = list(self.active_alerts.values())
         
         # Apply filters
@@ -212,31 +290,102 @@ class AlertSystem:
             alerts = [a for a in alerts if a["type"] == alert_type.value]
         
         if min_severity:
-            severity_values = [s.value for s in AlertSeverity]
-            min_idx = severity_values.index(min_severity.value)
-            alerts = [a for a in alerts if severity_values.index(a["severity"]) >= min_idx]
+            min_idx = _SEVERITY_ORDER[min_severity.value]
+            alerts = [a for a in alerts if _SEVERITY_ORDER[a["severity"]] >= min_idx]
         
         return alerts
     
     def _save_alert(self, alert: Dict[str, Any]) -> None:
-        """Save an alert to disk."""
-        try:
-            status = alert["status"]
-            alert_type = alert["type"]
-            filename = f"{status}_{alert_type}_{alert['id']}.json"
-            filepath = os.path.join(self.alerts_dir, filename)
-            
-            with open(filepath, 'w') as f:
-                json.dump(alert, f, indent=2)
-            
-            # If alert was resolved, remove the active alert file
-            if status == "resolved":
-                active_file = filepath.replace("resolved_", "active_")
-                if os.path.exists(active_file):
-                    os.remove(active_file)
-                    
-        except Exception as e:
-            logger.error(f"Error saving alert to file: {e}")
+        """Queue an alert for persistence by the writer thread."""
+        # Snapshot: resolve_alert mutates the dict after the active-state save
+        self._write_queue.put(dict(alert))
+
+    def flush(self) -> None:
+        """Block until all queued alert writes have hit disk."""
+        self._write_queue.join()
+
+    def _alert_writer(self) -> None:
+        """Writer-thread loop: drain queued alerts and persist them in batches."""
+        while True:
+            batch = [self._write_queue.get()]
+            # Under an alert storm, take whatever else is already queued so
+            # one wakeup handles the whole burst.
+            while len(batch) < 64:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            appended = False
+            for alert in batch:
+                try:
+                    appended = self._append_alert_record(alert) or appended
+                except Exception as e:
+                    logger.error(f"Error saving alert to log: {e}")
+                finally:
+                    self._write_queue.task_done()
+
+            # One flush per drained batch rather than per record
+            if appended:
+                try:
+                    self._log_fp.flush()
+                except Exception as e:
+                    logger.error(f"Error flushing alert log: {e}")
+
+    def _append_alert_record(self, alert: Dict[str, Any]) -> bool:
+        """Append one alert record to the daily JSONL log (writer thread only).
+
+        Resolution is just another line with status "resolved"; no renames
+        or per-alert files. Returns whether a line was written.
+        """
+        alert_id = alert["id"]
+        payload = dumps_json_compact(alert)
+        if self._saved_hashes.get(alert_id) == hash(payload):
+            return False  # Identical to what's already logged
+
+        day = datetime.now().strftime('%Y%m%d')
+        if self._log_fp is None or self._log_day != day:
+            if self._log_fp is not None:
+                self._log_fp.close()
+            self._log_fp = open(
+                os.path.join(self.alerts_dir, f"alerts-{day}.jsonl"), 'ab'
+            )
+            self._log_day = day
+
+        self._log_fp.write(payload + b"\n")
+        if alert["status"] == "resolved":
+            self._saved_hashes.pop(alert_id, None)
+        else:
+            self._saved_hashes[alert_id] = hash(payload)
+        return True
+
+    def _replay_recent_logs(self, days: int = 2) -> None:
+        """Rebuild active-alert state from the recent JSONL logs at startup."""
+        for offset in range(days, -1, -1):
+            day = datetime.now() - timedelta(days=offset)
+            path = os.path.join(self.alerts_dir, f"alerts-{day.strftime('%Y%m%d')}.jsonl")
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        alert = loads_json(line)
+                        if alert["status"] == "active":
+                            self.active_alerts[alert["id"]] = alert
+                            key = alert["details"].get("_dedup_key")
+                            if key:
+                                self._active_alert_keys.add(key)
+                        else:
+                            previous = self.active_alerts.pop(alert["id"], None)
+                            if previous:
+                                key = previous["details"].get("_dedup_key")
+                                if key:
+                                    self._active_alert_keys.discard(key)
+            except Exception as e:
+                logger.error(f"Error replaying alert log {path}: {e}")
     
     def _register_default_handlers(self) -> None:
         """Register default alert handlers."""
@@ -275,22 +424,22 @@ class AlertSystem:
                 p95_ms = metrics.get("p95_ms")
                 
                 if p95_ms and p95_ms > threshold_ms:
-                    # Generate a unique key for this alert to prevent duplicates
+                    # Dedup key: at most one alert per category per hour while
+                    # the previous one is still active
                     alert_key = f"performance_{category}_{datetime.now().strftime('%Y%m%d_%H')}"
-                    
-                    # Only trigger if we don't already have an active alert for this
-                    if alert_key not in self.active_alerts:
-                        self.trigger_alert(
-                            alert_type=AlertType.PERFORMANCE,
-                            severity=AlertSeverity.WARNING,
-                            message=f"Performance degradation in {category}: p95 latency {p95_ms:.2f}ms exceeds threshold {threshold_ms}ms",
-                            details={
-                                "category": category,
-                                "p95_ms": p95_ms,
-                                "threshold_ms": threshold_ms,
-                                "metrics": metrics
-                            }
-                        )
+
+                    self.trigger_alert(
+                        alert_type=AlertType.PERFORMANCE,
+                        severity=AlertSeverity.WARNING,
+                        message=f"Performance degradation in {category}: p95 latency {p95_ms:.2f}ms exceeds threshold {threshold_ms}ms",
+                        details={
+                            "category": category,
+                            "p95_ms": p95_ms,
+                            "threshold_ms": threshold_ms,
+                            "metrics": metrics
+                        },
+                        dedup_key=alert_key
+                    )
     
     def _check_error_rate_alerts(self) -> None:
         """Check for error rate alert conditions."""
@@ -302,58 +451,54 @@ class AlertSystem:
             error_rate = current_metrics["failed_requests"] / max(1, current_metrics["total_requests"])
             
             if error_rate > max_rate and current_metrics["total_requests"] >= 10:
-                # Generate a unique key for this alert
                 alert_key = f"error_rate_{datetime.now().strftime('%Y%m%d_%H')}"
-                
-                if alert_key not in self.active_alerts:
-                    self.trigger_alert(
-                        alert_type=AlertType.ERROR_RATE,
-                        severity=AlertSeverity.ERROR,
-                        message=f"High error rate: {error_rate:.2%} exceeds threshold {max_rate:.2%}",
-                        details={
-                            "error_rate": error_rate,
-                            "threshold": max_rate,
-                            "failed_requests": current_metrics["failed_requests"],
-                            "total_requests": current_metrics["total_requests"]
-                        }
-                    )
+
+                self.trigger_alert(
+                    alert_type=AlertType.ERROR_RATE,
+                    severity=AlertSeverity.ERROR,
+                    message=f"High error rate: {error_rate:.2%} exceeds threshold {max_rate:.2%}",
+                    details={
+                        "error_rate": error_rate,
+                        "threshold": max_rate,
+                        "failed_requests": current_metrics["failed_requests"],
+                        "total_requests": current_metrics["total_requests"]
+                    },
+                    dedup_key=alert_key
+                )
     
-    def _background_monitor(self) -> None:
-        """Background thread to monitor for alert conditions."""
-        while True:
-            try:
-                # Check each type of alert
-                self._check_performance_alerts()
-                self._check_error_rate_alerts()
-                
-                # Check for auto-resolution of alerts
-                self._auto_resolve_alerts()
-                
-                # Sleep for 60 seconds
-                time.sleep(60)
-                
-            except Exception as e:
-                logger.error(f"Error in alert monitor: {e}")
-                time.sleep(60)
+    def _run_alert_checks(self) -> None:
+        """One monitor cycle: threshold checks plus auto-resolution."""
+        self._check_performance_alerts()
+        self._check_error_rate_alerts()
+        self._auto_resolve_alerts()
     
     def _auto_resolve_alerts(self) -> None:
         """Automatically resolve alerts that are no longer relevant."""
-        with self.alert_lock:
-            for alert_id, alert in list(self.active_alerts.items()):
+        # Fetch metrics once, collect candidates under the lock, then resolve
+        # after releasing it (resolve_alert takes the lock itself).
+        metrics = self.performance_tracker.get_performance_metrics()
+        to_resolve = []
+
+        with self.alert_lock.read_locked():
+            for alert_id, alert in self.active_alerts.items():
                 # Check if performance alerts can be auto-resolved
-                if alert["type"] == AlertType.PERFORMANCE.value:
-                    category = alert["details"].get("category")
-                    if category:
-                        metrics = self.performance_tracker.get_performance_metrics()
-                        if category in metrics:
-                            p95_ms = metrics[category].get("p95_ms")
-                            threshold_ms = alert["details"].get("threshold_ms")
-                            
-                            if p95_ms and threshold_ms and p95_ms < threshold_ms:
-                                self.resolve_alert(
-                                    alert_id=alert_id,
-                                    resolution_message=f"Performance recovered: {category} p95 latency now {p95_ms:.2f}ms (below threshold {threshold_ms}ms)"
-                                )
+                if alert["type"] != AlertType.PERFORMANCE.value:
+                    continue
+                category = alert["details"].get("category")
+                if not category or category not in metrics:
+                    continue
+
+                p95_ms = metrics[category].get("p95_ms")
+                threshold_ms = alert["details"].get("threshold_ms")
+
+                if p95_ms and threshold_ms and p95_ms < threshold_ms:
+                    to_resolve.append((
+                        alert_id,
+                        f"Performance recovered: {category} p95 latency now {p95_ms:.2f}ms (below threshold {threshold_ms}ms)"
+                    ))
+
+        for alert_id, resolution_message in to_resolve:
+            self.resolve_alert(alert_id=alert_id, resolution_message=resolution_message)
 
 # Singleton instance
 alert_system = AlertSystem()
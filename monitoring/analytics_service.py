@@ -1,9 +1,8 @@
 # monitoring/analytics_service.py
+import heapq
 import os
-import json
 import logging
-import threading
-import time
+from operator import itemgetter
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 import pandas as pd
@@ -11,6 +10,8 @@ import numpy as np
 from collections import Counter, defaultdict
 
 from .metrics_collector import metrics_collector
+from ._scheduler import scheduler
+from ._serialization import dump_json_file
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,7 +19,10 @@ logger = logging.getLogger(__name__)
 
 class AnalyticsService:
     """Service for analyzing and reporting on collected metrics."""
-    
+
+    # How many users keep full detail in the daily report
+    TOP_USERS = 50
+
     def __init__(self, analytics_dir: str = "analytics"):
         """
         Initialize the analytics service.
@@ -32,9 +36,11 @@ class AnalyticsService:
         # Create analytics directory if it doesn't exist
         os.makedirs(analytics_dir, exist_ok=True)
         
-        # Start background analytics generator
-        self._analytics_thread = threading.Thread(target=self._background_analytics_generator, daemon=True)
-        self._analytics_thread.start()
+        # Report generation runs on the monitoring package's shared scheduler;
+        # the daily report fires at actual midnight instead of an hourly loop
+        # polling for the midnight window
+        scheduler.every(3600, self._write_hourly_report, name="hourly_analytics")
+        scheduler.daily_at_midnight(self._write_daily_report, name="daily_analytics")
         
         logger.info(f"Analytics service initialized, storing reports in {analytics_dir}")
     
@@ -47,24 +53,28 @@ class AnalyticsService:
         """
         # Get current metrics
         current_metrics = self.metrics_collector.get_current_metrics()
-        
-        # Get historical data
-        historical_metrics = self.metrics_collector.historical_metrics
-        
-        # Calculate daily statistics
-        daily_stats = self._calculate_daily_stats(historical_metrics)
-        
+
+        # One DataFrame shared by every sub-analysis below; each used to
+        # hand-roll its own groupby over the same historical list
+        df = self._metrics_frame(self.metrics_collector.history_snapshot())
+
+        # Daily statistics come from the collector's rolling per-day buckets,
+        # maintained incrementally as requests complete
+        daily_stats = self._stats_from_buckets(
+            self.metrics_collector.daily_buckets_snapshot(), include_usage=True
+        )
+
         # Create the report
         report = {
             "report_type": "daily",
             "generated_at": datetime.now().isoformat(),
             "current_metrics": current_metrics,
             "daily_statistics": daily_stats,
-            "user_analytics": self._analyze_users(historical_metrics),
-            "performance_analytics": self._analyze_performance(historical_metrics),
-            "content_analytics": self._analyze_content(historical_metrics)
+            "user_analytics": self._analyze_users(df),
+            "performance_analytics": self._analyze_performance(df),
+            "content_analytics": self._analyze_content(df)
         }
-        
+
         return report
     
     def generate_hourly_report(self) -> Dict[str, Any]:
@@ -81,275 +91,279 @@ class AnalyticsService:
         now = datetime.now()
         last_day = now - timedelta(days=1)
         
-        historical_metrics = [
-            m for m in self.metrics_collector.historical_metrics
-            if datetime.fromisoformat(m["timestamp"]) >= last_day
-        ]
-        
-        # Calculate hourly statistics
-        hourly_stats = self._calculate_hourly_stats(historical_metrics)
-        
+        # History is time-ordered, so the collector bisects to the cutoff
+        # instead of parsing and comparing every record
+        historical_metrics = self.metrics_collector.metrics_since(last_day)
+        df = self._metrics_frame(historical_metrics)
+
+        # Hourly statistics come from the collector's rolling per-hour buckets
+        hourly_stats = self._stats_from_buckets(
+            self.metrics_collector.hourly_buckets_snapshot()
+        )
+
         # Create the report
         report = {
             "report_type": "hourly",
             "generated_at": now.isoformat(),
             "current_metrics": current_metrics,
             "hourly_statistics": hourly_stats,
-            "performance_trends": self._analyze_hourly_performance(historical_metrics)
+            "performance_trends": self._analyze_hourly_performance(df)
         }
-        
+
         return report
-    
-    def _calculate_daily_stats(self, metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Calculate daily statistics from historical metrics."""
+
+    @staticmethod
+    def _metrics_frame(metrics: List[Dict[str, Any]]) -> Optional[pd.DataFrame]:
+        """Build the shared analysis DataFrame, or None when there is no data."""
         if not metrics:
-            return {"message": "No metrics available"}
-        
-        # Group by day
-        metrics_by_day = defaultdict(list)
-        for m in metrics:
-            day = datetime.fromisoformat(m["timestamp"]).strftime("%Y-%m-%d")
-            metrics_by_day[day].append(m)
-        
-        # Calculate stats for each day
-        daily_stats = {}
-        for day, day_metrics in metrics_by_day.items():
-            successful = sum(1 for m in day_metrics if m["success"])
-            failed = len(day_metrics) - successful
-            
-            latencies = [m["latency_ms"] for m in day_metrics]
-            avg_latency = sum(latencies) / len(latencies) if latencies else 0
-            
-            tool_calls = Counter()
-            agent_calls = Counter()
-            for m in day_metrics:
-                for tool, count in m["tool_calls"].items():
-                    tool_calls[tool] += count
-                for agent, count in m["agent_calls"].items():
-                    agent_calls[agent] += count
-            
-            daily_stats[day] = {
-                "total_requests": len(day_metrics),
-                "successful_requests": successful,
-                "failed_requests": failed,
-                "success_rate": successful / len(day_metrics) if day_metrics else 0,
-                "average_latency_ms": avg_latency,
-                "top_tools": dict(tool_calls.most_common(5)),
-                "top_agents": dict(agent_calls.most_common(5))
-            }
-        
-        return daily_stats
+            return None
+        df = pd.DataFrame(metrics)
+        df["ts"] = pd.to_datetime(df["timestamp"])
+        return df
     
-    def _calculate_hourly_stats(self, metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Calculate hourly statistics from historical metrics."""
-        if not metrics:
+    def _stats_from_buckets(self, buckets: Dict[str, Dict[str, Any]],
+                            include_usage: bool = False) -> Dict[str, Any]:
+        """Derive per-bucket statistics from the collector's rolling aggregates.
+
+        The buckets already hold counts and sums, so this only divides and
+        (optionally) ranks tool/agent usage — O(buckets), not O(metrics).
+        """
+        if not buckets:
             return {"message": "No metrics available"}
-        
-        # Group by hour
-        metrics_by_hour = defaultdict(list)
-        for m in metrics:
-            hour = datetime.fromisoformat(m["timestamp"]).strftime("%Y-%m-%d %H:00")
-            metrics_by_hour[hour].append(m)
-        
-        # Calculate stats for each hour
-        hourly_stats = {}
-        for hour, hour_metrics in metrics_by_hour.items():
-            successful = sum(1 for m in hour_metrics if m["success"])
-            failed = len(hour_metrics) - successful
-            
-            latencies = [m["latency_ms"] for m in hour_metrics]
-            avg_latency = sum(latencies) / len(latencies) if latencies else 0
-            
-            hourly_stats[hour] = {
-                "total_requests": len(hour_metrics),
+
+        stats = {}
+        for key, acc in buckets.items():
+            count = acc["count"]
+            successful = acc["successful"]
+            entry = {
+                "total_requests": count,
                 "successful_requests": successful,
-                "failed_requests": failed,
-                "success_rate": successful / len(hour_metrics) if hour_metrics else 0,
-                "average_latency_ms": avg_latency
+                "failed_requests": count - successful,
+                "success_rate": successful / count,
+                "average_latency_ms": acc["latency_sum"] / count
             }
-        
-        return hourly_stats
+            if include_usage:
+                # Bucket usage maps are plain dicts, ranked only here
+                entry["top_tools"] = dict(
+                    heapq.nlargest(5, acc["tool_calls"].items(), key=itemgetter(1))
+                )
+                entry["top_agents"] = dict(
+                    heapq.nlargest(5, acc["agent_calls"].items(), key=itemgetter(1))
+                )
+            stats[key] = entry
+
+        return stats
     
-    def _analyze_users(self, metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_users(self, df: Optional[pd.DataFrame]) -> Dict[str, Any]:
         """Analyze user behavior from metrics."""
-        if not metrics:
+        if df is None:
             return {"message": "No metrics available"}
-        
-        # Group by user
-        metrics_by_user = defaultdict(list)
-        for m in metrics:
-            metrics_by_user[m["user_id"]].append(m)
-        
-        # Calculate user statistics
-        user_stats = {}
-        for user_id, user_metrics in metrics_by_user.items():
-            # Calculate basic stats
-            request_count = len(user_metrics)
-            session_count = len(set(m["session_id"] for m in user_metrics))
-            
-            # Tool usage
-            tool_usage = Counter()
-            for m in user_metrics:
-                for tool, count in m["tool_calls"].items():
-                    tool_usage[tool] += count
-            
-            # Calculate retention
-            timestamps = sorted([datetime.fromisoformat(m["timestamp"]) for m in user_metrics])
-            first_seen = timestamps[0] if timestamps else None
-            last_seen = timestamps[-1] if timestamps else None
-            days_active = len(set(ts.date() for ts in timestamps))
-            
-            user_stats[user_id] = {
-                "request_count": request_count,
-                "session_count": session_count,
-                "first_seen": first_seen.isoformat() if first_seen else None,
-                "last_seen": last_seen.isoformat() if last_seen else None,
-                "days_active": days_active,
-                "preferred_tools": dict(tool_usage.most_common(3))
+
+        # One C-level groupby replaces the per-user Python loops that sorted
+        # timestamps and counted sessions by hand
+        grouped = df.groupby("user_id").agg(
+            request_count=("request_id", "size"),
+            session_count=("session_id", "nunique"),
+            first_seen=("ts", "min"),
+            last_seen=("ts", "max"),
+            days_active=("ts", lambda s: s.dt.normalize().nunique())
+        )
+
+        # The report keeps detail only for the heaviest users: a full
+        # per-user map grows with every user ever seen and gets serialized
+        # daily, while consumers read the aggregates plus a leaderboard.
+        # Any single user's profile stays available via get_user_details.
+        top = grouped.loc[grouped["request_count"].nlargest(self.TOP_USERS).index]
+        top_ids = set(top.index)
+
+        # Tool usage stays Python: the per-metric tool_calls dicts don't
+        # vectorize, but each is merged exactly once. These are one-shot
+        # top-K queries, so a plain dict plus nlargest avoids building a
+        # Counter per user just to call most_common on it.
+        preferred_tools = {}
+        for user_id, dicts in df.groupby("user_id")["tool_calls"]:
+            if user_id not in top_ids:
+                continue
+            usage = defaultdict(int)
+            for d in dicts:
+                for tool, count in d.items():
+                    usage[tool] += count
+            preferred_tools[user_id] = dict(
+                heapq.nlargest(3, usage.items(), key=itemgetter(1))
+            )
+
+        top_users = {
+            user_id: {
+                "request_count": int(row.request_count),
+                "session_count": int(row.session_count),
+                "first_seen": row.first_seen.isoformat(),
+                "last_seen": row.last_seen.isoformat(),
+                "days_active": int(row.days_active),
+                "preferred_tools": preferred_tools[user_id]
             }
-        
+            for user_id, row in top.iterrows()
+        }
+
         # Overall user analytics
-        active_users = len(user_stats)
-        new_users_last_day = sum(
-            1 for user, stats in user_stats.items() 
-            if datetime.fromisoformat(stats["first_seen"]) >= datetime.now() - timedelta(days=1)
-        )
-        
+        cutoff = datetime.now() - timedelta(days=1)
         return {
-            "active_users": active_users,
-            "new_users_last_day": new_users_last_day,
-            "user_details": user_stats
+            "active_users": len(grouped),
+            "new_users_last_day": int((grouped["first_seen"] >= cutoff).sum()),
+            "top_users": top_users
+        }
+
+    def get_user_details(self, user_id: str) -> Dict[str, Any]:
+        """
+        Compute detail statistics for a single user on demand.
+
+        The daily report only carries the top-user leaderboard; callers that
+        need a specific user's profile get it here, straight from the
+        collector's history.
+
+        Args:
+            user_id: The user to profile
+
+        Returns:
+            Dict[str, Any]: The user's usage statistics
+        """
+        df = self._metrics_frame([
+            m for m in self.metrics_collector.history_snapshot()
+            if m["user_id"] == user_id
+        ])
+        if df is None:
+            return {"message": f"No metrics available for user {user_id}"}
+
+        usage = defaultdict(int)
+        for d in df["tool_calls"]:
+            for tool, count in d.items():
+                usage[tool] += count
+
+        ts = df["ts"]
+        return {
+            "request_count": len(df),
+            "session_count": int(df["session_id"].nunique()),
+            "first_seen": ts.min().isoformat(),
+            "last_seen": ts.max().isoformat(),
+            "days_active": int(ts.dt.normalize().nunique()),
+            "preferred_tools": dict(heapq.nlargest(3, usage.items(), key=itemgetter(1)))
         }
     
-    def _analyze_performance(self, metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_performance(self, df: Optional[pd.DataFrame]) -> Dict[str, Any]:
         """Analyze performance metrics."""
-        if not metrics:
+        if df is None:
             return {"message": "No metrics available"}
-        
-        # Extract latencies
-        latencies = [m["latency_ms"] for m in metrics]
-        
+
+        # Columns come out of the shared DataFrame as NumPy arrays: the stats
+        # below run at C level, and percentile computes median+p95 from one
+        # partition instead of two Python sorts.
+        latencies = df["latency_ms"].to_numpy(dtype=np.float64)
+        tokens_in = df["llm_tokens_in"].to_numpy(dtype=np.int64)
+        tokens_out = df["llm_tokens_out"].to_numpy(dtype=np.int64)
+
+        median_latency, p95_latency = np.percentile(latencies, [50, 95])
+
         # Calculate performance metrics
         performance = {
-            "average_latency_ms": sum(latencies) / len(latencies) if latencies else 0,
-            "median_latency_ms": sorted(latencies)[len(latencies)//2] if latencies else 0,
-            "p95_latency_ms": sorted(latencies)[int(len(latencies)*0.95)] if latencies else 0,
-            "min_latency_ms": min(latencies) if latencies else 0,
-            "max_latency_ms": max(latencies) if latencies else 0,
-            "total_llm_tokens_in": sum(m["llm_tokens_in"] for m in metrics),
-            "total_llm_tokens_out": sum(m["llm_tokens_out"] for m in metrics),
+            "average_latency_ms": float(latencies.mean()),
+            "median_latency_ms": float(median_latency),
+            "p95_latency_ms": float(p95_latency),
+            "min_latency_ms": float(latencies.min()),
+            "max_latency_ms": float(latencies.max()),
+            "total_llm_tokens_in": int(tokens_in.sum()),
+            "total_llm_tokens_out": int(tokens_out.sum()),
             "average_tokens_per_request": {
-                "in": sum(m["llm_tokens_in"] for m in metrics) / len(metrics) if metrics else 0,
-                "out": sum(m["llm_tokens_out"] for m in metrics) / len(metrics) if metrics else 0
+                "in": float(tokens_in.mean()),
+                "out": float(tokens_out.mean())
             }
         }
-        
+
         # Analyze performance by tool
         tool_latencies = defaultdict(list)
-        for m in metrics:
-            for tool in m["tool_calls"]:
-                tool_latencies[tool].append(m["latency_ms"])
-        
+        for tool_calls, latency in zip(df["tool_calls"], latencies):
+            for tool in tool_calls:
+                tool_latencies[tool].append(latency)
+
         tool_performance = {}
-        for tool, latencies in tool_latencies.items():
+        for tool, tool_lats in tool_latencies.items():
+            lats = np.asarray(tool_lats, dtype=np.float64)
             tool_performance[tool] = {
-                "count": len(latencies),
-                "average_latency_ms": sum(latencies) / len(latencies) if latencies else 0,
-                "p95_latency_ms": sorted(latencies)[int(len(latencies)*0.95)] if len(latencies) >= 20 else None
+                "count": len(tool_lats),
+                "average_latency_ms": float(lats.mean()),
+                "p95_latency_ms": float(np.percentile(lats, 95)) if len(tool_lats) >= 20 else None
             }
         
         performance["tool_performance"] = tool_performance
         return performance
     
-    def _analyze_content(self, metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_content(self, df: Optional[pd.DataFrame]) -> Dict[str, Any]:
         """Analyze content usage patterns."""
         # This would normally analyze the actual content of messages
         # For this demo, we'll focus on tool and agent usage patterns
-        if not metrics:
+        if df is None:
             return {"message": "No metrics available"}
-        
+
         # Analyze tool usage patterns
         all_tool_calls = Counter()
-        for m in metrics:
-            for tool, count in m["tool_calls"].items():
-                all_tool_calls[tool] += count
-        
+        for tool_calls in df["tool_calls"]:
+            all_tool_calls.update(tool_calls)
+
         # Analyze agent delegation patterns
         all_agent_calls = Counter()
-        for m in metrics:
-            for agent, count in m["agent_calls"].items():
-                all_agent_calls[agent] += count
-        
+        for agent_calls in df["agent_calls"]:
+            all_agent_calls.update(agent_calls)
+
         # Calculate common tool sequences (simplified)
         # In a real system, this would analyze the actual sequence of tool calls
-        
+
         return {
             "most_used_tools": dict(all_tool_calls.most_common(10)),
             "most_delegated_agents": dict(all_agent_calls.most_common(5)),
-            "guardrail_block_rate": sum(m["guardrail_blocks"] for m in metrics) / len(metrics) if metrics else 0
+            "guardrail_block_rate": float(df["guardrail_blocks"].mean())
         }
-    
-    def _analyze_hourly_performance(self, metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
+
+    def _analyze_hourly_performance(self, df: Optional[pd.DataFrame]) -> Dict[str, Any]:
         """Analyze performance trends by hour."""
-        if not metrics:
+        if df is None:
             return {"message": "No metrics available"}
-        
-        # Group by hour
-        metrics_by_hour = defaultdict(list)
-        for m in metrics:
-            hour = datetime.fromisoformat(m["timestamp"]).strftime("%Y-%m-%d %H:00")
-            metrics_by_hour[hour].append(m)
-        
-        # Calculate performance trends
+
+        # groupby on the hour label runs the bucketing in C; per-group stats
+        # are vectorized column reductions
         hourly_performance = {}
-        for hour, hour_metrics in metrics_by_hour.items():
-            latencies = [m["latency_ms"] for m in hour_metrics]
-            
+        for hour, group in df.groupby(df["ts"].dt.strftime("%Y-%m-%d %H:00")):
+            latencies = group["latency_ms"]
+            count = len(group)
             hourly_performance[hour] = {
-                "request_count": len(hour_metrics),
-                "average_latency_ms": sum(latencies) / len(latencies) if latencies else 0,
-                "p95_latency_ms": sorted(latencies)[int(len(latencies)*0.95)] if len(latencies) >= 20 else None,
-                "error_rate": sum(1 for m in hour_metrics if not m["success"]) / len(hour_metrics) if hour_metrics else 0,
+                "request_count": count,
+                "average_latency_ms": float(latencies.mean()),
+                "p95_latency_ms": float(latencies.quantile(0.95)) if count >= 20 else None,
+                "error_rate": float((~group["success"]).mean()),
                 "token_usage": {
-                    "in": sum(m["llm_tokens_in"] for m in hour_metrics),
-                    "out": sum(m["llm_tokens_out"] for m in hour_metrics)
+                    "in": int(group["llm_tokens_in"].sum()),
+                    "out": int(group["llm_tokens_out"].sum())
                 }
             }
-        
+
         return hourly_performance
     
-    def _background_analytics_generator(self) -> None:
-        """Background thread to periodically generate and save analytics reports."""
-        while True:
-            try:
-                # Generate and save hourly report
-                hourly_report = self.generate_hourly_report()
-                hourly_filename = f"hourly_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                hourly_filepath = os.path.join(self.analytics_dir, hourly_filename)
-                
-                with open(hourly_filepath, 'w') as f:
-                    json.dump(hourly_report, f, indent=2)
-                
-                logger.info(f"Generated hourly analytics report: {hourly_filepath}")
-                
-                # Generate daily report once per day (at midnight)
-                now = datetime.now()
-                if now.hour == 0 and now.minute < 10:  # Between midnight and 12:10 AM
-                    daily_report = self.generate_daily_report()
-                    daily_filename = f"daily_report_{now.strftime('%Y%m%d')}.json"
-                    daily_filepath = os.path.join(self.analytics_dir, daily_filename)
-                    
-                    with open(daily_filepath, 'w') as f:
-                        json.dump(daily_report, f, indent=2)
-                    
-                    logger.info(f"Generated daily analytics report: {daily_filepath}")
-                
-                # Sleep for 1 hour
-                time.sleep(3600)
-                
-            except Exception as e:
-                logger.error(f"Error in analytics generator: {e}")
-                time.sleep(300)  # 5 minutes on error
+    def _write_hourly_report(self) -> None:
+        """Generate and persist the hourly analytics report."""
+        hourly_report = self.generate_hourly_report()
+        hourly_filename = f"hourly_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        hourly_filepath = os.path.join(self.analytics_dir, hourly_filename)
+
+        dump_json_file(hourly_report, hourly_filepath)
+
+        logger.info(f"Generated hourly analytics report: {hourly_filepath}")
+
+    def _write_daily_report(self) -> None:
+        """Generate and persist the daily analytics report."""
+        daily_report = self.generate_daily_report()
+        daily_filename = f"daily_report_{datetime.now().strftime('%Y%m%d')}.json"
+        daily_filepath = os.path.join(self.analytics_dir, daily_filename)
+
+        dump_json_file(daily_report, daily_filepath)
+
+        logger.info(f"Generated daily analytics report: {daily_filepath}")
 
 # Singleton instance
 analytics_service = AnalyticsService()
\ No newline at end of file
@@ -1,25 +1,53 @@
 # monitoring/logger.py (tiếp theo)
+import atexit
 import logging
 import os
 import pytest
 import json
+import queue
 import threading
 import traceback
 from datetime import datetime
 from typing import Dict, Any, Optional
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import tempfile
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# Shared empty params dict for requests without parameters, so the hot
+# logging helpers don't allocate one per call
+_EMPTY_PARAMS: Dict[str, Any] = {}
+
+# [whole second, formatted prefix] cache for record timestamps: strftime
+# runs once per second, and records within it only append microseconds
+_TS_CACHE: list = [0, ""]
+
 class JSONFormatter(logging.Formatter):
     """Format log records as JSON for better parsing."""
     
     def __init__(self, **kwargs):
         self.kwargs = kwargs
         super().__init__()
-    
+        # The extra context is identical on every record, so serialize it
+        # once and splice the encoded key/value text into each line instead
+        # of merging and re-encoding the same constants per record
+        if orjson is not None:
+            self._static_prefix = orjson.dumps(kwargs, default=str)[1:-1].decode()
+        else:
+            self._static_prefix = json.dumps(kwargs, default=str)[1:-1]
+
     def format(self, record):
+        # Timestamps share the cached per-second prefix; formatting a record
+        # costs an integer compare and one f-string for the microseconds
+        sec = int(record.created)
+        if sec != _TS_CACHE[0]:
+            _TS_CACHE[0] = sec
+            _TS_CACHE[1] = datetime.fromtimestamp(sec).strftime("%Y-%m-%dT%H:%M:%S")
         log_data = {
-            "timestamp": datetime.fromtimestamp(record.created).isoformat(),
+            "timestamp": f"{_TS_CACHE[1]}.{int((record.created - sec) * 1e6):06d}",
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -30,11 +58,6 @@ class JSONFormatter(logging.Formatter):
             "process": record.process
         }
         
-        # Add extra context from kwargs
-        for key, value in self.kwargs.items():
-            if key not in log_data:
-                log_data[key] = value
-        
         # Add extra context from record
         if hasattr(record, 'request_id'):
             log_data['request_id'] = record.request_id
@@ -50,7 +73,17 @@ class JSONFormatter(logging.Formatter):
                 'traceback': traceback.format_exception(*record.exc_info)
             }
         
-        return json.dumps(log_data)
+        # Runs on every record: orjson serializes in C, with str() as the
+        # fallback for any exotic values smuggled in via extra=. The static
+        # prefix goes first, so a duplicated key resolves to the record's
+        # value — same precedence the old dict merge gave.
+        if orjson is not None:
+            payload = orjson.dumps(log_data, default=str).decode()
+        else:
+            payload = json.dumps(log_data, default=str)
+        if self._static_prefix:
+            payload = "{" + self._static_prefix + "," + payload[1:]
+        return payload
 
 class StructuredLoggerAdapter(logging.LoggerAdapter):
     """Logger adapter that adds structured context to log records."""
@@ -87,6 +120,11 @@ class LogManager:
         # Thread-local storage for request context
         self.context = threading.local()
 
+        # Base loggers for the per-request helpers, resolved once: the hot
+        # path then skips the getLogger lookup and adapter construction
+        self._request_logger = logging.getLogger("api.request")
+        self._response_logger = logging.getLogger("api.response")
+
         logger = logging.getLogger(__name__)
         logger.info(f"Log manager initialized, storing logs in {log_dir}")
 
@@ -117,8 +155,7 @@ class LogManager:
         file_handler.setLevel(logging.INFO)
         file_formatter = JSONFormatter(**self.default_context)
         file_handler.setFormatter(file_formatter)
-        root_logger.addHandler(file_handler)
-        
+
         # Error log file (separate file for errors and above)
         error_log_file = os.path.join(self.log_dir, "errors.log")
         error_handler = RotatingFileHandler(
@@ -126,7 +163,30 @@ class LogManager:
         )
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(file_formatter)
-        root_logger.addHandler(error_handler)
+
+        # The file handlers do JSON formatting and disk writes, so they sit
+        # behind a queue: request threads only enqueue the record and never
+        # contend on the handler lock or block on rotation/I/O. A single
+        # listener thread owns both file handlers.
+        previous = getattr(self, "_listener", None)
+        if previous is not None:
+            previous.stop()
+
+        self._log_queue: "queue.Queue" = queue.Queue(-1)
+        root_logger.addHandler(QueueHandler(self._log_queue))
+
+        self._listener = QueueListener(
+            self._log_queue, file_handler, error_handler,
+            respect_handler_level=True
+        )
+        self._listener.start()
+        atexit.register(self._stop_listener)
+
+    def _stop_listener(self) -> None:
+        """Stop the queue listener, draining any queued records first."""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
     
     def get_logger(self, name: str, **context) -> logging.Logger:
         """
@@ -180,12 +240,19 @@ class LogManager:
             path: Request path
             params: Request parameters (sanitized)
         """
-        logger = self.get_logger("api.request", request_id=request_id, user_id=user_id)
-        logger.info(f"{method} {path}", extra={
+        # Context goes straight into extra=; building a StructuredLoggerAdapter
+        # per request is a dict merge plus an allocation this path can skip
+        extra = {
+            "request_id": request_id,
+            "user_id": user_id,
             "http_method": method,
             "path": path,
-            "params": params or {}
-        })
+            "params": params or _EMPTY_PARAMS
+        }
+        data = getattr(self.context, "data", None)
+        if data:
+            extra = {**data, **extra}
+        self._request_logger.info("%s %s", method, path, extra=extra)
     
     def log_response(self, request_id: str, status_code: int, 
                     duration_ms: float, error: Optional[str] = None) -> None:
@@ -198,20 +265,25 @@ class LogManager:
             duration_ms: Request duration in milliseconds
             error: Error message if applicable
         """
-        logger = self.get_logger("api.response", request_id=request_id)
-        
-        log_data = {
+        extra = {
+            "request_id": request_id,
             "status_code": status_code,
             "duration_ms": duration_ms
         }
-        
+        data = getattr(self.context, "data", None)
+        if data:
+            extra = {**data, **extra}
+
         if error:
-            log_data["error"] = error
-            logger.error(f"Response {status_code} in {duration_ms:.2f}ms - {error}", 
-                       extra=log_data)
+            extra["error"] = error
+            self._response_logger.error(
+                "Response %s in %.2fms - %s", status_code, duration_ms, error,
+                extra=extra
+            )
         else:
-            logger.info(f"Response {status_code} in {duration_ms:.2f}ms", 
-                      extra=log_data)
+            self._response_logger.info(
+                "Response %s in %.2fms", status_code, duration_ms, extra=extra
+            )
 
 # Singleton instance
 log_manager = LogManager()
@@ -1,12 +1,18 @@
 # monitoring/metrics_collector.py
+import bisect
+import itertools
 import time
 import threading
 import logging
-from typing import Dict, Any, List, Optional, Set, Counter
-import json
+from typing import Deque, Dict, Any, List, Optional, Set, Counter
 import os
+from collections import defaultdict, deque
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
+import numpy as np
+
+from ._scheduler import scheduler
+from ._serialization import RollingNdjsonFile
 
 
 
@@ -21,6 +27,9 @@ class MetricsContext:
     user_id: str
     session_id: str
     start_time: float = field(default_factory=time.time)
+    # Monotonic twin of start_time: latency comes from the monotonic clock,
+    # which integer-counts and can't jump with wall-clock adjustments
+    start_ns: int = field(default_factory=time.monotonic_ns)
     end_time: Optional[float] = None
     llm_call_count: int = 0
     llm_tokens_in: int = 0
@@ -34,12 +43,18 @@ class MetricsContext:
     def complete(self):
         """Mark the context as complete and calculate latency."""
         self.end_time = time.time()
-        self.latency_ms = (self.end_time - self.start_time) * 1000
+        self.latency_ms = (time.monotonic_ns() - self.start_ns) / 1_000_000
         return self
 
 class MetricsCollector:
     """Collects and manages metrics from the banking bot."""
-    
+
+    # Cap on concurrently tracked requests: past it, requests are still
+    # served but their metrics are dropped instead of growing the dict
+    MAX_ACTIVE = 10_000
+    # Active contexts older than this are failed out as abandoned
+    ABANDONED_TTL_SECONDS = 600
+
     def __init__(self, metrics_dir: str = "metrics"):
         """
         Initialize the metrics collector.
@@ -49,42 +64,157 @@ class MetricsCollector:
         """
         self.metrics_dir = metrics_dir
         self.active_contexts: Dict[str, MetricsContext] = {}
-        self.historical_metrics: List[Dict[str, Any]] = []
         self.max_historical = 1000  # Max records to keep in memory
+        # deque(maxlen=...) evicts the oldest record in O(1) on append,
+        # where list.pop(0) shifted every remaining element
+        self.historical_metrics: Deque[Dict[str, Any]] = deque(maxlen=self.max_historical)
+        # Epoch timestamps kept in lockstep with historical_metrics, so
+        # time-window queries can bisect instead of parsing every record
+        self._historical_ts: Deque[float] = deque(maxlen=self.max_historical)
+        # Appends and reads share this lock: iterating a deque while another
+        # thread appends raises RuntimeError (at maxlen every append mutates
+        # both ends), so readers copy under the lock instead
+        self._history_lock = threading.Lock()
+
+        # Struct-of-arrays ring mirror of the numeric history columns.
+        # Aggregate math in get_current_metrics reduces these contiguous
+        # arrays in C rather than walking the dict history in Python.
+        self._latency_ring = np.empty(self.max_historical, dtype=np.float64)
+        self._success_ring = np.empty(self.max_historical, dtype=np.bool_)
+        self._ring_count = 0
+
+        # Rolling per-hour and per-day aggregates, folded in as each request
+        # completes. Report generation snapshots these instead of re-walking
+        # the whole history on every poll.
+        self._hourly_buckets: Dict[str, Dict[str, Any]] = {}
+        self._daily_buckets: Dict[str, Dict[str, Any]] = {}
+        # Folding, eviction and snapshots all run under this lock: unguarded,
+        # two concurrent completions could double-delete a stale key or lose
+        # accumulator increments
+        self._bucket_lock = threading.Lock()
         
         # Create metrics directory if it doesn't exist
         os.makedirs(metrics_dir, exist_ok=True)
-        
-        # Performance metrics
-        self.total_requests = 0
-        self.successful_requests = 0
-        self.failed_requests = 0
-        self.total_latency_ms = 0
-        self.tool_usage: Counter = Counter()
-        self.agent_usage: Counter = Counter()
-        self.guardrail_blocks = 0
-        
+
+        # Snapshots append to one rolling NDJSON log opened once, instead of
+        # creating a new timestamped file every write interval
+        self._snapshot_log = RollingNdjsonFile(
+            os.path.join(metrics_dir, "metrics_log.ndjson")
+        )
+
+        # Performance counters live in per-thread dicts registered here, so
+        # the hot recording paths never mutate shared state; readers fold the
+        # registry on demand. The lock guards registration only — each dict
+        # is written by exactly one thread afterwards.
+        self._local = threading.local()
+        self._thread_counters: List[Dict[str, Any]] = []
+        self._register_lock = threading.Lock()
+
+        # Bounds active_contexts: a slot is taken per tracked request and
+        # given back on completion (including janitor-forced completion)
+        self._active_slots = threading.BoundedSemaphore(self.MAX_ACTIVE)
+
+        # Periodically fail out contexts whose requests never completed, so
+        # a leaked request_id can't hold its slot and memory forever
+        scheduler.every(60, self._expire_abandoned_contexts, name="metrics_janitor")
+
         # Start background metrics writer
         self._writer_thread = threading.Thread(target=self._background_metrics_writer, daemon=True)
         self._writer_thread.start()
         
         logger.info(f"Metrics collector initialized, storing data in {metrics_dir}")
-    
-    def start_request(self, request_id: str, user_id: str, session_id: str) -> str:
+
+    def _counters(self) -> Dict[str, Any]:
+        """Return this thread's counter dict, registering it on first use."""
+        counters = getattr(self._local, "counters", None)
+        if counters is None:
+            counters = {
+                "total_requests": 0,
+                "successful_requests": 0,
+                "failed_requests": 0,
+                "guardrail_blocks": 0,
+                "overflow_dropped": 0,
+                "tool_usage": Counter(),
+                "agent_usage": Counter(),
+            }
+            self._local.counters = counters
+            with self._register_lock:
+                self._thread_counters.append(counters)
+        return counters
+
+    def _fold_counters(self) -> Dict[str, Any]:
+        """Reduce the per-thread counter dicts into one aggregate view."""
+        folded = {
+            "total_requests": 0,
+            "successful_requests": 0,
+            "failed_requests": 0,
+            "guardrail_blocks": 0,
+            "overflow_dropped": 0,
+            "tool_usage": Counter(),
+            "agent_usage": Counter(),
+        }
+        with self._register_lock:
+            snapshot = list(self._thread_counters)
+        for counters in snapshot:
+            folded["total_requests"] += counters["total_requests"]
+            folded["successful_requests"] += counters["successful_requests"]
+            folded["failed_requests"] += counters["failed_requests"]
+            folded["guardrail_blocks"] += counters["guardrail_blocks"]
+            folded["overflow_dropped"] += counters["overflow_dropped"]
+            folded["tool_usage"].update(counters["tool_usage"])
+            folded["agent_usage"].update(counters["agent_usage"])
+        return folded
+
+    @property
+    def total_requests(self) -> int:
+        return sum(c["total_requests"] for c in self._thread_counters)
+
+    @property
+    def successful_requests(self) -> int:
+        return sum(c["successful_requests"] for c in self._thread_counters)
+
+    @property
+    def failed_requests(self) -> int:
+        return sum(c["failed_requests"] for c in self._thread_counters)
+
+    @property
+    def guardrail_blocks(self) -> int:
+        return sum(c["guardrail_blocks"] for c in self._thread_counters)
+
+    @property
+    def tool_usage(self) -> Counter:
+        merged: Counter = Counter()
+        for counters in self._thread_counters:
+            merged.update(counters["tool_usage"])
+        return merged
+
+    @property
+    def agent_usage(self) -> Counter:
+        merged: Counter = Counter()
+        for counters in self._thread_counters:
+            merged.update(counters["agent_usage"])
+        return merged
+
+    def start_request(self, request_id: str, user_id: str, session_id: str) -> Optional[str]:
         """
         Start tracking metrics for a new request.
-        
+
         Args:
             request_id: Unique identifier for the request
             user_id: User identifier
             session_id: Session identifier
-            
+
         Returns:
-            str: The request ID for reference
+            Optional[str]: The request ID for reference, or None when
+                tracking capacity is exhausted (the request itself proceeds;
+                the record_* helpers all no-op on an untracked ID)
         """
+        if not self._active_slots.acquire(blocking=False):
+            self._counters()["overflow_dropped"] += 1
+            return None
         context = MetricsContext(request_id=request_id, user_id=user_id, session_id=session_id)
         self.active_contexts[request_id] = context
-        self.total_requests += 1
+        self._counters()["total_requests"] += 1
         return request_id
     
     def record_llm_call(self, request_id: str, tokens_in: int, tokens_out: int) -> None:
@@ -100,21 +230,21 @@ class MetricsCollector:
         if request_id in self.active_contexts:
             context = self.active_contexts[request_id]
             context.tool_calls[tool_name] += 1
-            self.tool_usage[tool_name] += 1
+            self._counters()["tool_usage"][tool_name] += 1
     
     def record_agent_call(self, request_id: str, agent_name: str) -> None:
         """Record an agent invocation."""
         if request_id in self.active_contexts:
             context = self.active_contexts[request_id]
             context.agent_calls[agent_name] += 1
-            self.agent_usage[agent_name] += 1
+            self._counters()["agent_usage"][agent_name] += 1
     
     def record_guardrail_block(self, request_id: str, reason: str) -> None:
         """Record a request blocked by a guardrail."""
         if request_id in self.active_contexts:
             context = self.active_contexts[request_id]
             context.guardrail_blocks += 1
-            self.guardrail_blocks += 1
+            self._counters()["guardrail_blocks"] += 1
     
     def record_error(self, request_id: str, error_message: str) -> None:
         """Record an error that occurred during processing."""
@@ -133,21 +263,21 @@ class MetricsCollector:
         Returns:
             Optional[MetricsContext]: The completed context, or None if not found
         """
-        if request_id not in self.active_contexts:
+        # Claim the context atomically: the janitor and the owning request
+        # thread can race to complete the same ID, and only the winner may
+        # free its tracking slot
+        context = self.active_contexts.pop(request_id, None)
+        if context is None:
             return None
-        
-        # Get the context and mark it complete
-        context = self.active_contexts.pop(request_id)
+        self._active_slots.release()
         context.complete()
         
         # Update aggregate metrics
         if success:
-            self.successful_requests += 1
+            self._counters()["successful_requests"] += 1
         else:
-            self.failed_requests += 1
-        
-        self.total_latency_ms += context.latency_ms
-        
+            self._counters()["failed_requests"] += 1
+
         # Convert to dict for storage
         context_dict = {
             "request_id": context.request_id,
@@ -165,13 +295,124 @@ class MetricsCollector:
             "success": success
         }
         
-        # Add to historical metrics with capped size
-        self.historical_metrics.append(context_dict)
-        if len(self.historical_metrics) > self.max_historical:
-            self.historical_metrics.pop(0)
-        
+        # Add to historical metrics; the deques drop their oldest entry
+        # themselves once max_historical is reached. The ring update shares
+        # the lock: its slot-claim/write/increment is a read-modify-write
+        # that would otherwise lose increments and leave never-written
+        # np.empty slots inside the reduced window.
+        with self._history_lock:
+            slot = self._ring_count % self.max_historical
+            self._latency_ring[slot] = context.latency_ms
+            self._success_ring[slot] = success
+            self._ring_count += 1
+            self.historical_metrics.append(context_dict)
+            self._historical_ts.append(context.start_time)
+
+        self._update_buckets(context_dict)
+
         return context
+
+    def _expire_abandoned_contexts(self) -> None:
+        """Fail out active contexts older than the TTL.
+
+        A request that never reaches complete_request would otherwise hold
+        its dict entry and tracking slot forever; this records it as a
+        failed request with an explanatory error instead.
+        """
+        deadline = time.monotonic_ns() - self.ABANDONED_TTL_SECONDS * 1_000_000_000
+        for request_id, context in list(self.active_contexts.items()):
+            if context.start_ns < deadline:
+                logger.warning(f"Expiring abandoned metrics context {request_id}")
+                self.record_error(request_id, "abandoned: request never completed")
+                self.complete_request(request_id, success=False)
+
+    def _update_buckets(self, metric: Dict[str, Any]) -> None:
+        """Fold one completed metric into the rolling hour/day aggregates."""
+        ts = datetime.fromisoformat(metric["timestamp"])
+        with self._bucket_lock:
+            self._fold_metric(ts, metric)
+            self._evict_stale_buckets()
+
+    def _fold_metric(self, ts: datetime, metric: Dict[str, Any]) -> None:
+        """Add one metric to both bucket maps. Caller holds _bucket_lock."""
+        for buckets, key in (
+            (self._hourly_buckets, ts.strftime("%Y-%m-%d %H:00")),
+            (self._daily_buckets, ts.strftime("%Y-%m-%d")),
+        ):
+            acc = buckets.get(key)
+            if acc is None:
+                # Plain defaultdicts, not Counters: this runs on the request
+                # completion path and an explicit item loop skips Counter's
+                # update machinery. Ranking happens at report time.
+                acc = buckets[key] = {
+                    "count": 0, "successful": 0, "latency_sum": 0.0,
+                    "tokens_in": 0, "tokens_out": 0,
+                    "tool_calls": defaultdict(int), "agent_calls": defaultdict(int)
+                }
+            acc["count"] += 1
+            acc["successful"] += bool(metric["success"])
+            acc["latency_sum"] += metric["latency_ms"]
+            acc["tokens_in"] += metric["llm_tokens_in"]
+            acc["tokens_out"] += metric["llm_tokens_out"]
+            tools = acc["tool_calls"]
+            for tool, count in metric["tool_calls"].items():
+                tools[tool] += count
+            agents = acc["agent_calls"]
+            for agent, count in metric["agent_calls"].items():
+                agents[agent] += count
+
+    def _evict_stale_buckets(self) -> None:
+        """Drop stale buckets to bound memory. Caller holds _bucket_lock."""
+        # Keys sort lexicographically in time order, so a string cutoff works
+        hour_cutoff = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d %H:00")
+        for key in [k for k in self._hourly_buckets if k < hour_cutoff]:
+            del self._hourly_buckets[key]
+
+        day_cutoff = (datetime.now() - timedelta(days=31)).strftime("%Y-%m-%d")
+        for key in [k for k in self._daily_buckets if k < day_cutoff]:
+            del self._daily_buckets[key]
+
+    def hourly_buckets_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Copy of the last-24h per-hour aggregates, safe to read off-thread."""
+        with self._bucket_lock:
+            return self._snapshot_buckets(self._hourly_buckets)
+
+    def daily_buckets_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Copy of the last-31-day per-day aggregates, safe to read off-thread."""
+        with self._bucket_lock:
+            return self._snapshot_buckets(self._daily_buckets)
+
+    @staticmethod
+    def _snapshot_buckets(buckets: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        # Counters are copied too: request threads keep mutating the live ones
+        return {
+            key: {k: (v.copy() if isinstance(v, dict) else v) for k, v in acc.items()}
+            for key, acc in buckets.items()
+        }
     
+    def metrics_since(self, cutoff: datetime) -> List[Dict[str, Any]]:
+        """
+        Return historical metrics recorded at or after the cutoff.
+
+        History is appended in timestamp order, so the cutoff index is found
+        by binary search on the parallel epoch list — O(log N) plus the slice,
+        with no timestamp parsing.
+
+        Args:
+            cutoff: Earliest timestamp (inclusive) to include
+
+        Returns:
+            List[Dict[str, Any]]: Metrics from the cutoff onwards
+        """
+        with self._history_lock:
+            start = bisect.bisect_left(self._historical_ts, cutoff.timestamp())
+            return list(itertools.islice(self.historical_metrics, start, None))
+
+    def history_snapshot(self) -> List[Dict[str, Any]]:
+        """Copy of the full historical metrics, safe to iterate off-thread."""
+        with self._history_lock:
+            return list(self.historical_metrics)
+
     def get_current_metrics(self) -> Dict[str, Any]:
         """
         Get current aggregate metrics.
@@ -179,19 +420,25 @@ class MetricsCollector:
         Returns:
             Dict[str, Any]: Current metrics
         """
-        avg_latency = 0
-        if self.total_requests > 0:
-            avg_latency = self.total_latency_ms / self.total_requests
-        
+        # Reduce the rings over however many completed requests they hold
+        # (at most max_historical): one C loop each over contiguous memory
+        filled = min(self._ring_count, self.max_historical)
+        avg_latency = float(self._latency_ring[:filled].mean()) if filled else 0
+        success_rate = float(self._success_ring[:filled].mean()) if filled else 0.0
+
+        # One fold over the per-thread registry rather than a scan per field
+        counters = self._fold_counters()
+
         return {
-            "total_requests": self.total_requests,
-            "successful_requests": self.successful_requests,
-            "failed_requests": self.failed_requests,
-            "success_rate": self.successful_requests / max(1, self.total_requests),
+            "total_requests": counters["total_requests"],
+            "successful_requests": counters["successful_requests"],
+            "failed_requests": counters["failed_requests"],
+            "success_rate": success_rate,
             "average_latency_ms": avg_latency,
-            "top_tools": dict(self.tool_usage.most_common(5)),
-            "top_agents": dict(self.agent_usage.most_common(5)),
-            "guardrail_blocks": self.guardrail_blocks,
+            "top_tools": dict(counters["tool_usage"].most_common(5)),
+            "top_agents": dict(counters["agent_usage"].most_common(5)),
+            "guardrail_blocks": counters["guardrail_blocks"],
+            "overflow_dropped": counters["overflow_dropped"],
             "active_requests": len(self.active_contexts)
         }
     
@@ -199,21 +446,27 @@ class MetricsCollector:
         """Background thread to periodically write metrics to disk."""
         while True:
             try:
-                # Create a timestamp for the metrics file
-                now = datetime.now()
-                filename = f"metrics_{now.strftime('%Y%m%d_%H%M%S')}.json"
-                filepath = os.path.join(self.metrics_dir, filename)
-                
                 # Get a snapshot of the current metrics
                 metrics = self.get_current_metrics()
-                metrics["timestamp"] = now.isoformat()
-                metrics["recent_requests"] = self.historical_metrics[-100:] if self.historical_metrics else []
-                
-                # Write to file
-                with open(filepath, 'w') as f:
-                    json.dump(metrics, f, indent=2)
-                
-                logger.debug(f"Wrote metrics to {filepath}")
+                metrics["timestamp"] = datetime.now().isoformat()
+                # Copy without underscore-prefixed cache keys other code may
+                # stash on a metric; they are process-local and not
+                # necessarily JSON-serializable.
+                with self._history_lock:
+                    history = self.historical_metrics
+                    recent = list(itertools.islice(
+                        history, max(0, len(history) - 100), None
+                    ))
+                metrics["recent_requests"] = [
+                    {k: v for k, v in m.items() if not k.startswith("_")}
+                    for m in recent
+                ]
+
+                # Append one line to the rolling log: a sequential write to an
+                # already-open file, no per-snapshot create/close
+                self._snapshot_log.append(metrics)
+
+                logger.debug(f"Appended metrics snapshot to {self._snapshot_log.path}")
                 
                 # Sleep for 5 minutes
                 time.sleep(300)
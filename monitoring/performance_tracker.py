@@ -1,25 +1,34 @@
+import itertools
 import time
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Deque, Dict, Any, Optional
 import threading
-import json
 import os
+from collections import deque
 from datetime import datetime
-from dataclasses import dataclass
-import statistics
+from dataclasses import dataclass, field
+import numpy as np
 
-from .metrics_collector import metrics_collector  
+from .metrics_collector import metrics_collector
+from ._serialization import RollingNdjsonFile
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Monotonic sequence mixed into trace IDs so two traces started within the
+# same clock tick can't collide
+_trace_counter = itertools.count()
+
 @dataclass
 class PerformanceData:
     """Data structure for tracking detailed performance metrics."""
     name: str
     category: str
     start_time: float
+    # Monotonic twin of start_time: duration comes from the monotonic clock,
+    # which integer-counts and can't jump with wall-clock adjustments
+    start_ns: int = field(default_factory=time.monotonic_ns)
     end_time: Optional[float] = None
     duration_ms: Optional[float] = None
     metadata: Dict[str, Any] = None
@@ -28,7 +37,7 @@ class PerformanceData:
     def complete(self) -> 'PerformanceData':
         """Mark as complete and calculate duration."""
         self.end_time = time.time()
-        self.duration_ms = (self.end_time - self.start_time) * 1000
+        self.duration_ms = (time.monotonic_ns() - self.start_ns) / 1_000_000
         return self
 
 class PerformanceTracker:
@@ -43,14 +52,30 @@ class PerformanceTracker:
         """
         self.storage_dir = storage_dir
         self.metrics_collector = metrics_collector
-        self.traces: Dict[str, PerformanceData] = {}
-        self.historical_data: Dict[str, List[PerformanceData]] = {}
+        # In-flight traces are sharded by trace_id hash: independent traces
+        # only contend when they land on the same shard, and the plain Locks
+        # skip the owner bookkeeping of the RLock they replace (no trace
+        # path re-enters its lock)
+        self._shard_count = 16
+        self._trace_shards: list = [{} for _ in range(self._shard_count)]
+        self._trace_locks = [threading.Lock() for _ in range(self._shard_count)]
+        # deque(maxlen=...) caps each category in O(1) per append, with no
+        # explicit length check or O(n) pop(0). Appends and reads share
+        # _history_lock: iterating a deque while another thread appends
+        # raises RuntimeError, so readers copy under the lock instead.
+        self.historical_data: Dict[str, Deque[PerformanceData]] = {}
+        self._history_lock = threading.Lock()
         self.thresholds: Dict[str, float] = {}
-        self.trace_lock = threading.RLock()
         
         # Create storage directory
         os.makedirs(storage_dir, exist_ok=True)
-        
+
+        # Snapshots append to one rolling NDJSON log opened once, instead of
+        # creating a new timestamped file every write interval
+        self._snapshot_log = RollingNdjsonFile(
+            os.path.join(storage_dir, "performance_log.ndjson")
+        )
+
         # Start background data writer
         self._writer_thread = threading.Thread(target=self._background_data_writer, daemon=True)
         self._writer_thread.start()
@@ -62,7 +87,12 @@ class PerformanceTracker:
         self.set_threshold("database_query", 100)  # 100 ms
         
         logger.info(f"Performance tracker initialized, storing data in {storage_dir}")
-    
+
+    def _shard(self, trace_id: str):
+        """Return the (dict, lock) shard pair that owns this trace ID."""
+        index = hash(trace_id) % self._shard_count
+        return self._trace_shards[index], self._trace_locks[index]
+
     def start_trace(self, name: str, category: str, request_id: Optional[str] = None, 
                    parent: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> str:
         """
@@ -78,10 +108,16 @@ class PerformanceTracker:
         Returns:
             str: Trace ID for reference
         """
-        trace_id = f"{name}_{int(time.time() * 1000)}_{hash(name) % 10000}"
+        # Monotonic ns plus a 20-bit sequence, hex-encoded: unique without
+        # the old time.time() float multiply, hash() and f-string format
+        # (which could collide for traces of the same name in the same ms)
+        trace_id = format(
+            (time.monotonic_ns() << 20) | (next(_trace_counter) & 0xFFFFF), "x"
+        )
         
-        with self.trace_lock:
-            self.traces[trace_id] = PerformanceData(
+        shard, lock = self._shard(trace_id)
+        with lock:
+            shard[trace_id] = PerformanceData(
                 name=name,
                 category=category,
                 start_time=time.time(),
@@ -91,7 +127,7 @@ class PerformanceTracker:
                 },
                 parent=parent
             )
-        
+
         return trace_id
     
     def end_trace(self, trace_id: str, success: bool = True) -> Optional[PerformanceData]:
@@ -105,33 +141,32 @@ class PerformanceTracker:
         Returns:
             Optional[PerformanceData]: The completed trace data, or None if not found
         """
-        with self.trace_lock:
-            if trace_id not in self.traces:
-                return None
-            
-            trace = self.traces.pop(trace_id)
-            trace.complete()
-            
-            # Add success status to metadata
-            if trace.metadata is None:
-                trace.metadata = {}
-            trace.metadata["success"] = success
-            
-            # Store in historical data
-            category = trace.category
-            if category not in self.historical_data:
-                self.historical_data[category] = []
-            
-            self.historical_data[category].append(trace)
-            
-            # Cap the size of historical data
-            if len(self.historical_data[category]) > 1000:
-                self.historical_data[category].pop(0)
-            
-            # Check against thresholds
-            self._check_threshold(trace)
-            
-            return trace
+        shard, lock = self._shard(trace_id)
+        with lock:
+            trace = shard.pop(trace_id, None)
+
+        if trace is None:
+            return None
+
+        trace.complete()
+
+        # Add success status to metadata
+        if trace.metadata is None:
+            trace.metadata = {}
+        trace.metadata["success"] = success
+
+        # Store in historical data; the deque drops its oldest trace itself
+        # once the per-category cap is reached
+        with self._history_lock:
+            history = self.historical_data.get(trace.category)
+            if history is None:
+                history = self.historical_data.setdefault(trace.category, deque(maxlen=1000))
+            history.append(trace)
+
+        # Check against thresholds
+        self._check_threshold(trace)
+
+        return trace
     
     def set_threshold(self, category: str, threshold_ms: float) -> None:
         """Set performance threshold for a category."""
@@ -155,24 +190,40 @@ class PerformanceTracker:
             Dict[str, Any]: Current performance metrics by category
         """
         metrics = {}
-        
-        for category, traces in self.historical_data.items():
+
+        # Copy each deque under the lock; the array math below then runs on
+        # stable lists while caller threads keep appending traces
+        with self._history_lock:
+            snapshot = {
+                category: list(traces)
+                for category, traces in self.historical_data.items()
+            }
+
+        for category, traces in snapshot.items():
             if not traces:
                 continue
-            
-            durations = [t.duration_ms for t in traces if t.duration_ms is not None]
-            if not durations:
+
+            durations = np.fromiter(
+                (t.duration_ms for t in traces if t.duration_ms is not None),
+                dtype=np.float64
+            )
+            if not durations.size:
                 continue
-            
+
+            # One percentile partition yields median and p95 in O(N),
+            # replacing a full sort per category per poll
+            median_ms, p95_ms = np.percentile(durations, [50, 95])
+            threshold = self.thresholds.get(category)
+
             metrics[category] = {
-                "count": len(durations),
-                "average_ms": statistics.mean(durations),
-                "median_ms": statistics.median(durations),
-                "p95_ms": sorted(durations)[int(len(durations) * 0.95)] if len(durations) >= 20 else None,
-                "min_ms": min(durations),
-                "max_ms": max(durations),
-                "threshold_ms": self.thresholds.get(category),
-                "threshold_exceeded_count": sum(1 for d in durations if d > self.thresholds.get(category, float('inf')))
+                "count": int(durations.size),
+                "average_ms": float(durations.mean()),
+                "median_ms": float(median_ms),
+                "p95_ms": float(p95_ms) if durations.size >= 20 else None,
+                "min_ms": float(durations.min()),
+                "max_ms": float(durations.max()),
+                "threshold_ms": threshold,
+                "threshold_exceeded_count": int((durations > threshold).sum()) if threshold is not None else 0
             }
         
         return metrics
@@ -186,14 +237,15 @@ class PerformanceTracker:
                     time.sleep(300)
                     continue
                 
-                # Create a timestamp for the file
-                now = datetime.now()
-                filename = f"performance_{now.strftime('%Y%m%d_%H%M%S')}.json"
-                filepath = os.path.join(self.storage_dir, filename)
-                
-                # Prepare data for serialization
+                # Prepare data for serialization from a copy taken under the
+                # lock, so in-flight appends can't mutate mid-iteration
+                with self._history_lock:
+                    snapshot = {
+                        category: list(traces)
+                        for category, traces in self.historical_data.items()
+                    }
                 serializable_data = {}
-                for category, traces in self.historical_data.items():
+                for category, traces in snapshot.items():
                     serializable_data[category] = [
                         {
                             "name": t.name,
@@ -211,16 +263,16 @@ class PerformanceTracker:
                 
                 # Combine data and metrics
                 output = {
-                    "timestamp": now.isoformat(),
+                    "timestamp": datetime.now().isoformat(),
                     "metrics": metrics,
                     "traces": serializable_data
                 }
-                
-                # Write to file
-                with open(filepath, 'w') as f:
-                    json.dump(output, f, indent=2)
-                
-                logger.debug(f"Wrote performance data to {filepath}")
+
+                # Append one line to the rolling log: a sequential write to an
+                # already-open file, no per-snapshot create/close
+                self._snapshot_log.append(output)
+
+                logger.debug(f"Appended performance snapshot to {self._snapshot_log.path}")
                 
                 # Sleep for 15 minutes
                 time.sleep(900)
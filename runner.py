@@ -42,6 +42,12 @@ from sessions.session_service import SessionFactory
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Sub-agents whose replies are near-deterministic and safe to cache; balance
+# and transfer responses depend on account state and must never be reused.
+_CACHEABLE_AUTHORS = frozenset({"greeting_agent", "farewell_agent"})
+_RESPONSE_CACHE_TTL = 300.0  # seconds
+_RESPONSE_CACHE_MAX = 4096
+
 class BankingBotRunner:
     """
     Main runner class for the Banking Bot that orchestrates the agent, 
@@ -96,6 +102,13 @@ class BankingBotRunner:
         # Hooks for custom pre/post processing
         self.before_processing_hooks = before_processing_hooks or []
         self.after_response_hooks = after_response_hooks or []
+
+        # TTL cache for near-deterministic greeting/farewell replies:
+        # normalized message -> (expiry, response template). A hit skips the
+        # LLM round-trip entirely.
+        self._response_cache: Dict[str, Any] = {}
+        self._cache_hits = 0
+        self._cache_misses = 0
         
         logger.info(f"BankingBotRunner initialized with agent: {root_agent.name}")
     
@@ -118,36 +131,7 @@ class BankingBotRunner:
         Returns:
             Dict[str, Any]: Response containing the agent's reply and metadata
         """
-        # Ensure session exists
-        session = self.session_service.get_session(
-            app_name=self.app_name,
-            user_id=user_id,
-            session_id=session_id
-        )
-        
-        if not session:
-            # Create new session
-            session = self.session_service.create_session(
-                app_name=self.app_name,
-                user_id=user_id,
-                session_id=session_id,
-                state={
-                    "user_authenticated": False,
-                    "conversation_start_time": asyncio.get_event_loop().time(),
-                    "message_count": 0,
-                    "context": context or {}
-                }
-            )
-            logger.info(f"Created new session for user {user_id}, session {session_id}")
-        
-        # Update session with context if provided
-        if context:
-            session.state["context"] = {**session.state.get("context", {}), **context}
-            self.session_service.update_session(session)
-        
-        # Track message count
-        session.state["message_count"] = session.state.get("message_count", 0) + 1
-        self.session_service.update_session(session)
+        session = self._ensure_session(user_id, session_id, context)
         
         # Execute before processing hooks
         for hook in self.before_processing_hooks:
@@ -156,9 +140,31 @@ class BankingBotRunner:
             except Exception as e:
                 logger.error(f"Error in before_processing_hook: {e}")
         
+        # Serve repeated greetings/farewells from the response cache. Any
+        # caller-supplied context opts the request out, which keeps stateful
+        # balance/transfer flows untouched.
+        cache_key = message.strip().lower() if not context else None
+        if cache_key is not None:
+            cached = self._cache_lookup(cache_key)
+            if cached is not None:
+                self._cache_hits += 1
+                response_data = {
+                    **cached,
+                    "user_id": user_id,
+                    "session_id": session_id,
+                    "cached": True
+                }
+                for hook in self.after_response_hooks:
+                    try:
+                        await hook(user_id, session_id, response_data)
+                    except Exception as e:
+                        logger.error(f"Error in after_response_hook: {e}")
+                return response_data
+            self._cache_misses += 1
+
         # Prepare user message in ADK format
         content = types.Content(role='user', parts=[types.Part(text=message)])
-        
+
         # Create a response object to collect data
         response_data = {
             "user_id": user_id,
@@ -230,9 +236,155 @@ class BankingBotRunner:
                 await hook(user_id, session_id, response_data)
             except Exception as e:
                 logger.error(f"Error in after_response_hook: {e}")
-        
+
+        if cache_key is not None:
+            self._maybe_cache_response(cache_key, response_data)
+
         return response_data
-    
+
+    def _cache_lookup(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response template for the key, or None."""
+        entry = self._response_cache.get(cache_key)
+        if entry is None:
+            return None
+        expiry, cached = entry
+        if asyncio.get_event_loop().time() > expiry:
+            del self._response_cache[cache_key]
+            return None
+        return cached
+
+    def _maybe_cache_response(self, cache_key: str, response_data: Dict[str, Any]) -> None:
+        """Cache the response if it came from a cacheable sub-agent."""
+        if response_data.get("error"):
+            return
+        final_author = next(
+            (e["author"] for e in reversed(response_data.get("events", []))
+             if e.get("is_final")),
+            None
+        )
+        if final_author not in _CACHEABLE_AUTHORS:
+            return
+
+        if len(self._response_cache) >= _RESPONSE_CACHE_MAX:
+            # Drop the oldest insertion; dicts preserve order.
+            self._response_cache.pop(next(iter(self._response_cache)))
+
+        # Store a template stripped of per-user fields; the hit path fills
+        # user_id/session_id back in.
+        template = {
+            key: value for key, value in response_data.items()
+            if key not in ("user_id", "session_id", "state_updates")
+        }
+        template["state_updates"] = {}
+        self._response_cache[cache_key] = (
+            asyncio.get_event_loop().time() + _RESPONSE_CACHE_TTL,
+            template
+        )
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size of the response cache."""
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "size": len(self._response_cache)
+        }
+
+    def _ensure_session(
+        self,
+        user_id: str,
+        session_id: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Session:
+        """Fetch the session, creating it and folding in context if needed."""
+        session = self.session_service.get_session(
+            app_name=self.app_name,
+            user_id=user_id,
+            session_id=session_id
+        )
+
+        if not session:
+            session = self.session_service.create_session(
+                app_name=self.app_name,
+                user_id=user_id,
+                session_id=session_id,
+                state={
+                    "user_authenticated": False,
+                    "conversation_start_time": asyncio.get_event_loop().time(),
+                    "message_count": 0,
+                    "context": context or {}
+                }
+            )
+            logger.info(f"Created new session for user {user_id}, session {session_id}")
+
+        # Update session with context if provided
+        if context:
+            session.state["context"] = {**session.state.get("context", {}), **context}
+            self.session_service.update_session(session)
+
+        # Track message count
+        session.state["message_count"] = session.state.get("message_count", 0) + 1
+        self.session_service.update_session(session)
+
+        return session
+
+    async def stream_message(
+        self,
+        user_id: str,
+        session_id: str,
+        message: str,
+        context: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Process a user message, yielding response fragments as they arrive.
+
+        Unlike process_message, which buffers the whole exchange, this is an
+        async generator: each ADK event with text content is yielded
+        immediately, so callers can put the first token on the wire without
+        waiting for full generation.
+
+        Args:
+            user_id: User identifier
+            session_id: Session identifier
+            message: The user's message text
+            context: Additional context information
+
+        Yields:
+            Dict[str, Any]: 'chunk' entries with partial text, then one
+            'done' entry carrying the aggregated response text.
+        """
+        self._ensure_session(user_id, session_id, context)
+
+        content = types.Content(role='user', parts=[types.Part(text=message)])
+        collected: List[str] = []
+
+        try:
+            async for event in self.runner.run_async(
+                user_id=user_id,
+                session_id=session_id,
+                new_message=content
+            ):
+                if event.content and event.content.parts:
+                    text = event.content.parts[0].text
+                    if text:
+                        collected.append(text)
+                        yield {
+                            "type": "chunk",
+                            "text": text,
+                            "author": event.author,
+                            "is_final": event.is_final_response()
+                        }
+        except Exception as e:
+            logger.error(f"Error streaming message: {e}")
+            yield {"type": "error", "error": str(e)}
+            return
+
+        yield {
+            "type": "done",
+            "response_text": collected[-1] if collected else None,
+            "user_id": user_id,
+            "session_id": session_id
+        }
+
     def _get_state_changes(self, old_state: Dict[str, Any], new_state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Identify changes between old and new session state.
@@ -271,8 +423,8 @@ class BankingBotRunner:
             Dict[str, Any]: Session information
         """
         if session_id is None:
-            import uuid
-            session_id = str(uuid.uuid4())
+            from utils.ids import new_session_id
+            session_id = new_session_id()
         
         default_state = {
             "user_authenticated": False,
@@ -425,44 +577,8 @@ def create_default_runner() -> BankingBotRunner:
     Returns:
         BankingBotRunner: Fully configured runner
     """
-    from agents import (
-        create_root_agent, 
-        create_greeting_agent, 
-        create_farewell_agent,
-        create_balance_agent,
-        create_transfer_agent
-    )
-    from tools import (
-        say_hello, 
-        say_goodbye, 
-        get_balance, 
-        transfer_money,
-        get_financial_advice
-    )
-    
-    # Create sub-agents
-    greeting_agent = create_greeting_agent(config.MODELS["greeting_agent"], say_hello)
-    farewell_agent = create_farewell_agent(config.MODELS["farewell_agent"], say_goodbye)
-    balance_agent = create_balance_agent(config.MODELS["balance_agent"], get_balance)
-    transfer_agent = create_transfer_agent(config.MODELS["transfer_agent"], transfer_money)
-    
-    # Create callbacks for security
-    before_model_callback = lambda ctx, req: InputGuard.blocked_keywords_guardrail(
-        ctx, req, set(config.BANKING_CONFIG["blocked_keywords"])
-    )
-    
-    before_tool_callback = lambda tool, args, ctx: ToolGuard.transfer_limit_guardrail(
-        tool, args, ctx, config.BANKING_CONFIG["max_transfer_amount"]
-    )
-    
-    # Create root agent with sub-agents and callbacks
-    root_agent = create_root_agent(
-        model_name=config.MODELS["root_agent"],
-        sub_agents=[greeting_agent, farewell_agent, balance_agent, transfer_agent],
-        tools=[get_financial_advice],
-        before_model_callback=before_model_callback,
-        before_tool_callback=before_tool_callback
-    )
-    
-    # Create and return the runner
-    return BankingBotRunner(root_agent=root_agent)
\ No newline at end of file
+    from agents.registry import get_root_agent
+
+    # The registry builds the agent tree (sub-agents, tools, guardrail
+    # callbacks) once per process and reuses it across runners.
+    return BankingBotRunner(root_agent=get_root_agent())
\ No newline at end of file
@@ -1,8 +1,11 @@
 # tests/test_api/test_chat_endpoints.py
 import pytest
 from fastapi.testclient import TestClient
+from unittest.mock import patch
 import json
 
+import app as app_module
+
 def test_chat_endpoint_success(test_client):
     """Test successful chat interaction with the API."""
     # Arrange
@@ -33,6 +36,45 @@ def test_chat_endpoint_invalid_request(test_client):
     
     # Act
     response = test_client.post("/api/chat", json=payload)
-    
+
     # Assert
     assert response.status_code == 422  # Validation error
+
+def test_chat_stream_endpoint_success(test_client):
+    """Test that the SSE streaming endpoint frames runner chunks correctly."""
+    # Arrange
+    payload = {
+        "message": "What's my checking account balance?",
+        "user_id": "test_user",
+        "session_id": "test_session"
+    }
+
+    async def fake_stream(user_id, session_id, message, context=None):
+        yield {"type": "chunk", "text": "Your balance is ", "is_final": False}
+        yield {"type": "chunk", "text": "$2,547.83.", "is_final": True}
+        yield {
+            "type": "done",
+            "response_text": "Your balance is $2,547.83.",
+            "user_id": user_id,
+            "session_id": session_id
+        }
+
+    # Act
+    with patch.object(app_module.runner, "stream_message", fake_stream):
+        response = test_client.post("/api/chat/stream", json=payload)
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = [
+        json.loads(line[len("data: "):])
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert len(events) == 3
+    assert [e["type"] for e in events] == ["chunk", "chunk", "done"]
+    final = events[-1]
+    assert final["user_id"] == "test_user"
+    assert final["session_id"] == "test_session"
+    assert final["response_text"] == "Your balance is $2,547.83."
@@ -1,5 +1,6 @@
 # tests/test_callbacks/test_before_model.py
 import pytest
+import config
 from callbacks.before_model import InputGuard
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models.llm_request import LlmRequest
@@ -56,3 +57,63 @@ def test_pii_detection_guardrail_allows_safe_input():
     result = InputGuard.pii_detection_guardrail(callback_context, llm_request)
     assert result is None
     assert "guardrail_pii_detected_types" not in callback_context.state
+
+def test_pii_detection_guardrail_blocks_real_phone():
+    callback_context = MagicMock(spec=CallbackContext)
+    callback_context.agent_name = "test_agent"
+    callback_context.state = {}
+
+    llm_request = LlmRequest(contents=[
+        Content(role="user", parts=[Part(text="You can reach me at 212-867-5309")])
+    ])
+
+    result = InputGuard.pii_detection_guardrail(callback_context, llm_request)
+    assert result is not None
+    assert "phone" in callback_context.state["guardrail_pii_detected_types"]
+
+def test_pii_detection_guardrail_skips_placeholder_phone():
+    callback_context = MagicMock(spec=CallbackContext)
+    callback_context.agent_name = "test_agent"
+    callback_context.state = {}
+
+    llm_request = LlmRequest(contents=[
+        Content(role="user", parts=[Part(text="Call 555-555-5555 to hear more")])
+    ])
+
+    result = InputGuard.pii_detection_guardrail(callback_context, llm_request)
+    assert result is None
+    assert "guardrail_pii_detected_types" not in callback_context.state
+
+def test_pii_detection_guardrail_ignores_non_nanp_numbers():
+    # Area and central-office codes starting with 0 or 1 are not valid NANP
+    # phone numbers (ISBNs, part numbers, 123-456-7890-style placeholders)
+    callback_context = MagicMock(spec=CallbackContext)
+    callback_context.agent_name = "test_agent"
+    callback_context.state = {}
+
+    llm_request = LlmRequest(contents=[
+        Content(role="user", parts=[Part(text="Order refs 123-456-7890 and 055-234-5678")])
+    ])
+
+    result = InputGuard.pii_detection_guardrail(callback_context, llm_request)
+    assert result is None
+    assert "guardrail_pii_detected_types" not in callback_context.state
+
+def test_blocked_keywords_guardrail_configured_lowercase_keywords():
+    # Regression: the configured keywords are lowercase in the env but the
+    # guard scans uppercased text, so the registry must hand it the
+    # pre-uppercased frozen set for configured words to block at all
+    callback_context = MagicMock(spec=CallbackContext)
+    callback_context.agent_name = "test_agent"
+    callback_context.state = {}
+
+    keyword = next(iter(config.BANKING.blocked_keywords)).strip()
+    content = Content(role="user", parts=[Part(text=f"what is my {keyword}?")])
+    llm_request = MagicMock(spec=LlmRequest)
+    llm_request.contents = [content]
+
+    result = InputGuard.blocked_keywords_guardrail(
+        callback_context, llm_request, config.BLOCKED_KEYWORDS_UPPER
+    )
+    assert result is not None
+    assert keyword.upper() in callback_context.state["guardrail_blocked_keywords"]
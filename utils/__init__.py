@@ -0,0 +1,5 @@
+# utils/__init__.py
+from .clock import now_iso
+from .ids import new_session_id
+
+__all__ = ['now_iso', 'new_session_id']
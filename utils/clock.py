@@ -0,0 +1,25 @@
+# utils/clock.py
+"""
+Cheap timestamp helpers for hot request paths.
+
+datetime.now().isoformat() costs a syscall plus Python-level string
+formatting per call. Response timestamps here are informational, so serving
+a value up to 100 ms stale is fine and turns the common case into a list
+lookup.
+"""
+import time
+from datetime import datetime
+
+_CACHE_WINDOW = 0.1  # seconds
+
+# [last_monotonic, cached_string]; a list so both slots mutate in place.
+_last = [0.0, ""]
+
+
+def now_iso() -> str:
+    """Return the current time as an ISO-8601 string, cached for ~100 ms."""
+    t = time.monotonic()
+    if t - _last[0] > _CACHE_WINDOW or not _last[1]:
+        _last[0] = t
+        _last[1] = datetime.now().isoformat()
+    return _last[1]
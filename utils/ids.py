@@ -0,0 +1,22 @@
+# utils/ids.py
+"""
+Identifier generation helpers.
+
+Session IDs use UUIDv7 when available: the timestamp-ordered layout keeps
+sessions created close in time adjacent in any sorted index (better locality
+in the session store) and gives cache-affinity routing a stable ordering.
+Falls back to random UUIDv4 if the uuid6 package is missing.
+"""
+import uuid
+
+try:
+    from uuid6 import uuid7 as _uuid7
+except ImportError:  # pragma: no cover - optional dependency
+    _uuid7 = None
+
+
+def new_session_id() -> str:
+    """Return a fresh session ID, time-ordered when UUIDv7 is available."""
+    if _uuid7 is not None:
+        return f"session_{_uuid7().hex}"
+    return f"session_{uuid.uuid4().hex}"